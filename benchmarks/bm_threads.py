@@ -0,0 +1,81 @@
+from django.conf import settings
+
+settings.configure()
+
+import os
+import sys
+import threading
+import time
+
+import drf_serpy
+
+from utils import Obj
+
+
+class SubS(drf_serpy.Serializer):
+    w = drf_serpy.IntField()
+    x = drf_serpy.MethodField()
+    y = drf_serpy.StrField()
+    z = drf_serpy.IntField()
+
+    def get_x(self, obj):
+        return obj.x + 10
+
+
+class ComplexS(drf_serpy.Serializer):
+    foo = drf_serpy.StrField()
+    bar = drf_serpy.IntField(call=True)
+    currency = drf_serpy.ContextField()
+    sub = SubS()
+    subs = SubS(many=True)
+
+
+def run(objs, num_threads, repetitions):
+    """Serialize ``objs`` ``repetitions`` times on each of ``num_threads``
+    threads and return the number of objects serialized per second.
+    """
+    barrier = threading.Barrier(num_threads + 1)
+
+    def work():
+        barrier.wait()
+        for _ in range(repetitions):
+            ComplexS(objs, many=True, context={"currency": "EUR"}).data
+
+    threads = [threading.Thread(target=work) for _ in range(num_threads)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    t1 = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    total_time = time.perf_counter() - t1
+    return int(num_threads * repetitions * len(objs) / total_time)
+
+
+if __name__ == "__main__":
+    data = {
+        "foo": "bar",
+        "bar": lambda: 5,
+        "sub": {"w": 1000, "x": 20, "y": "hello", "z": 10},
+        "subs": [{"w": 1000 * i, "x": 20 * i, "y": "hello" * i, "z": 10 * i} for i in range(10)],
+    }
+    objs = [Obj(**data) for _ in range(100)]
+    max_threads = int(sys.argv[1]) if len(sys.argv) > 1 else (os.cpu_count() or 1)
+    gil_enabled = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print("Python {0}, GIL {1}".format(sys.version.split()[0], "on" if gil_enabled else "off"))
+
+    baseline = None
+    with open("{0}.csv".format(__file__), "w+") as f:
+        f.write("threads,objs/s,speedup\n")
+        num_threads = 1
+        while num_threads <= max_threads:
+            objs_per_second = run(objs, num_threads, repetitions=50)
+            baseline = baseline or objs_per_second
+            speedup = objs_per_second / baseline
+            print(
+                "{0:>3} threads: {1:>9} objs/s ({2:.2f}x)".format(
+                    num_threads, objs_per_second, speedup
+                )
+            )
+            f.write("{0},{1},{2:.2f}\n".format(num_threads, objs_per_second, speedup))
+            num_threads *= 2
@@ -1,16 +1,31 @@
+from drf_serpy.encoders import JSONFragment
 from drf_serpy.fields import (
+    AnnotatedField,
+    Base64Field,
+    BatchMethodField,
     BoolField,
+    ConstField,
+    ContextField,
     DateField,
     DateTimeField,
+    DecimalField,
+    EnumField,
     Field,
     FloatField,
     ImageField,
     IntField,
+    JSONField,
     ListField,
+    Loader,
     MethodField,
+    RecursiveField,
+    RelatedIdField,
     StrField,
+    UUIDField,
 )
-from drf_serpy.serializer import DictSerializer, Serializer
+from drf_serpy.lazy import LazyList
+from drf_serpy.polymorphic import PolymorphicSerializer
+from drf_serpy.serializer import DictSerializer, Serializer, compile_stats, warmup
 
 __version__ = "0.4.4"
 __author__ = "Clark DuVall, Sergen Pekşen"
@@ -19,14 +34,31 @@ __license__ = "MIT"
 __all__ = [
     "Serializer",
     "DictSerializer",
+    "PolymorphicSerializer",
     "Field",
     "BoolField",
     "IntField",
     "FloatField",
     "MethodField",
+    "BatchMethodField",
+    "ConstField",
+    "AnnotatedField",
+    "ContextField",
     "StrField",
     "DateField",
     "DateTimeField",
     "ImageField",
     "ListField",
+    "RelatedIdField",
+    "RecursiveField",
+    "DecimalField",
+    "UUIDField",
+    "EnumField",
+    "JSONField",
+    "Base64Field",
+    "Loader",
+    "JSONFragment",
+    "LazyList",
+    "warmup",
+    "compile_stats",
 ]
@@ -0,0 +1,125 @@
+import importlib.util
+import json
+import uuid
+from typing import Any, Callable, List
+
+from drf_serpy.lazy import LazyList
+
+orjson = None  # noqa
+# use orjson if it is installed, otherwise fall back to the standard library
+if importlib.util.find_spec("orjson"):  # noqa
+    import orjson  # noqa
+
+
+class JSONFragment(bytes):
+    """Already encoded JSON that is spliced verbatim into the output.
+
+    Return a `JSONFragment` from a field (for example a nested object cached
+    as encoded JSON) and `dumps` will write its bytes as they are instead of
+    parsing and encoding them again:
+
+    Example:
+    ```py
+    class PostSerializer(Serializer):
+        author = MethodField()
+
+        def get_author(self, post):
+            return JSONFragment(cache.get(f"user:{post.author_id}"))
+
+    dumps(PostSerializer(post).data)
+    # b'{"author":{"id":1,"username":"serpy"}}'
+    ```
+
+    Note that fragments are not validated, and that the stdlib ``json`` module
+    based renderers of DRF can't encode them.
+    """
+
+    def __new__(cls, value: Any) -> "JSONFragment":
+        if isinstance(value, str):
+            value = value.encode("utf-8")
+        return super().__new__(cls, value)
+
+
+def _dumps_orjson(data: Any, default: Callable, indent: int) -> bytes:
+    option = orjson.OPT_NON_STR_KEYS
+    if indent:
+        option |= orjson.OPT_INDENT_2
+    return orjson.dumps(data, default=default, option=option)
+
+
+def _dumps_json(data: Any, default: Callable, indent: int) -> bytes:
+    separators = (",", ": ") if indent else (",", ":")
+    # NaN and infinities aren't valid JSON, like with DRF's STRICT_JSON
+    encoded = json.dumps(
+        data,
+        default=default,
+        indent=indent,
+        separators=separators,
+        ensure_ascii=False,
+        allow_nan=False,
+    )
+    return encoded.encode("utf-8")
+
+
+def dumps(data: Any, default: Callable = None, indent: int = None) -> bytes:
+    """Encode serialized data to JSON ``bytes``.
+
+    Serializers only produce dicts, lists and primitive types, which
+    ``orjson`` encodes natively without going through ``default``, so it is
+    used when it is installed. `JSONFragment` values are written verbatim.
+    ``NaN`` and infinities aren't valid JSON: ``orjson`` writes them as
+    ``null`` and the standard library raises `ValueError`.
+
+    :param data: The serialized data, e.g. ``Serializer(...).data``.
+    :param default: Called for objects the encoder doesn't support, like the
+        ``default`` argument of ``json.dumps``.
+    :param int indent: Indent the output, ``orjson`` only supports 2 spaces.
+    """
+    encode = _dumps_json if orjson is None else _dumps_orjson
+    fragment_cls = getattr(orjson, "Fragment", None)
+    if fragment_cls is not None:
+
+        def encode_default(obj: Any) -> Any:
+            if isinstance(obj, JSONFragment):
+                return fragment_cls(bytes(obj))
+            if isinstance(obj, LazyList):
+                return list(obj)
+            if default is None:
+                raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+            return default(obj)
+
+        return encode(data, encode_default, indent)
+
+    # Without native fragment support every fragment is replaced with a unique
+    # string placeholder, which is swapped for the fragment after encoding.
+    fragments: List[bytes] = []
+    nonce = None
+
+    def placeholder_default(obj: Any) -> Any:
+        nonlocal nonce
+        if isinstance(obj, JSONFragment):
+            if nonce is None:
+                # only paid for by data with fragments, e.g. not by each line of an export
+                nonce = uuid.uuid4().hex
+            fragments.append(obj)
+            return f"{nonce}{len(fragments) - 1}"
+        if isinstance(obj, LazyList):
+            return list(obj)
+        if default is None:
+            raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+        return default(obj)
+
+    encoded = encode(data, placeholder_default, indent)
+    if not fragments:
+        return encoded
+    return _splice_fragments(encoded, b'"' + nonce.encode("ascii"), fragments)
+
+
+def _splice_fragments(encoded: bytes, marker: bytes, fragments: List[bytes]) -> bytes:
+    parts = encoded.split(marker)
+    output = bytearray(parts[0])
+    for part in parts[1:]:
+        end = part.index(b'"')
+        output += fragments[int(part[:end])]
+        output += part[end + 1 :]
+    return bytes(output)
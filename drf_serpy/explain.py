@@ -0,0 +1,245 @@
+from collections import namedtuple
+from typing import Any, List, Optional, Set, Type
+
+from django.db.models import ForeignObjectRel
+
+from drf_serpy.fields import AnnotatedField, BatchMethodField, RecursiveField, RelatedIdField
+from drf_serpy.serializer import Serializer, SerializerBase, _is_collapsed
+
+#: A relation traversed by a serializer. ``path`` is the ORM lookup of the
+#: relation, ``kind`` is ``'forward'``, ``'reverse'`` or ``'m2m'``, ``many`` is
+#: whether it holds several objects and ``covered_by`` is ``'select_related'``,
+#: ``'prefetch_related'`` or ``None`` if it runs a query for every object.
+Relation = namedtuple("Relation", ["path", "kind", "many", "covered_by"])
+
+
+class Explanation(object):
+    """The queries a serializer runs on the objects of a model or QuerySet,
+    as estimated by `explain`.
+    """
+
+    def __init__(self, serializer_cls: Type[Serializer], model: Any):
+        self.serializer_cls = serializer_cls
+        self.model = model
+        #: The relations traversed by the serializer, see `Relation`.
+        self.relations: List[Relation] = []
+        #: Fields whose getter can't be analyzed, e.g. a `MethodField`.
+        self.opaque: List[str] = []
+        #: Fields resolved once for all the objects, e.g. a `BatchMethodField`.
+        self.batched: List[str] = []
+
+    @property
+    def n_plus_one(self) -> List[str]:
+        """The relations queried once for every serialized object."""
+        return [relation.path for relation in self.relations if relation.covered_by is None]
+
+    @property
+    def queries_per_row(self) -> int:
+        """The estimated number of queries for each serialized object.
+
+        Relations below a to-many relation run once per related object, so
+        this is a lower bound if any of them are in `n_plus_one`.
+        """
+        return len(self.n_plus_one)
+
+    @property
+    def fixed_queries(self) -> int:
+        """The estimated number of queries that don't depend on the number of
+        objects: the query of the objects, one per prefetched relation and
+        one per batched field.
+        """
+        prefetched = [r for r in self.relations if r.covered_by == "prefetch_related"]
+        return 1 + len(prefetched) + len(self.batched)
+
+    def __str__(self) -> str:
+        lines = ["{0} on {1}".format(self.serializer_cls.__name__, self.model.__name__)]
+        width = max([len(relation.path) for relation in self.relations] + [4])
+        for relation in self.relations:
+            lines.append(
+                "  {0:<{width}}  {1:<7}  {2}".format(
+                    relation.path, relation.kind, relation.covered_by or "N+1", width=width
+                )
+            )
+        if self.opaque:
+            lines.append("  opaque: {0}".format(", ".join(self.opaque)))
+        if self.batched:
+            lines.append("  batched: {0}".format(", ".join(self.batched)))
+        lines.append(
+            "  queries: {0} + {1} per object".format(self.fixed_queries, self.queries_per_row)
+        )
+        return "\n".join(lines)
+
+
+def _get_relation(model: Any, name: str) -> Optional[Any]:
+    """Return the relation of ``model`` accessed as ``name``, ``None`` for a
+    column. Raises ``LookupError`` if ``name`` isn't a field of the model.
+    """
+    meta = model._meta
+    for field in meta.get_fields():
+        if isinstance(field, ForeignObjectRel) and not field.many_to_many:
+            # reverse relations are accessed with their accessor name
+            if field.get_accessor_name() == name:
+                return field
+        elif field.name == name:
+            return field if field.is_relation else None
+    for field in meta.get_fields():
+        if isinstance(field, ForeignObjectRel) and field.many_to_many:
+            if field.get_accessor_name() == name:
+                return field
+    raise LookupError(name)
+
+
+def _relation_kind(field: Any) -> str:
+    if field.many_to_many:
+        return "m2m"
+    if field.concrete:
+        return "forward"
+    return "reverse"
+
+
+class _Coverage(object):
+    """The relations fetched up front by the ``select_related`` and
+    ``prefetch_related`` calls of a QuerySet.
+    """
+
+    def __init__(self, queryset: Any):
+        self.select_related = False
+        self.prefetched: Set[str] = set()
+        if queryset is None:
+            return
+        self.select_related = queryset.query.select_related
+        for lookup in queryset._prefetch_related_lookups:
+            lookup = getattr(lookup, "prefetch_to", lookup)
+            parts = lookup.split("__")
+            # prefetching a__b fetches a as well
+            for i in range(1, len(parts) + 1):
+                self.prefetched.add("__".join(parts[:i]))
+
+    def covered_by(self, path: List[str], field: Any) -> Optional[str]:
+        # a prefetch reuses the objects already fetched by select_related
+        if not (field.many_to_many or field.one_to_many) and self._selected(path, field):
+            return "select_related"
+        if "__".join(path) in self.prefetched:
+            return "prefetch_related"
+        return None
+
+    def _selected(self, path: List[str], field: Any) -> bool:
+        selected = self.select_related
+        if selected is True:
+            # select_related() without fields follows the non null foreign keys
+            return field.concrete and not field.null
+        for name in path:
+            if not isinstance(selected, dict) or name not in selected:
+                return False
+            selected = selected[name]
+        return True
+
+
+def _walk(
+    explanation: Explanation,
+    coverage: _Coverage,
+    serializer_cls: Type[Serializer],
+    model: Any,
+    prefix: List[str],
+    seen: Set[Type[Serializer]],
+):
+    for name, field in serializer_cls._field_map.items():
+        dotted = ".".join(prefix + [name])
+        if isinstance(field, AnnotatedField):
+            continue
+        if field.per_call and not isinstance(field, SerializerBase):
+            # constant and context fields don't read the object
+            continue
+        if isinstance(field, BatchMethodField) or field.loader is not None:
+            explanation.batched.append(dotted)
+            continue
+        if field.getter_takes_serializer or field.call:
+            explanation.opaque.append(dotted)
+            continue
+
+        attr = field.attr or name
+        if isinstance(field, RelatedIdField) or _is_collapsed(field):
+            if not field.many:
+                # the key is read from the foreign key column
+                continue
+            nested = None
+        elif isinstance(field, RecursiveField):
+            nested = serializer_cls
+        elif isinstance(field, SerializerBase):
+            nested = type(field)
+        else:
+            nested = None
+        _walk_path(explanation, coverage, model, prefix, attr.split("."), nested, dotted, seen)
+
+
+def _walk_path(
+    explanation: Explanation,
+    coverage: _Coverage,
+    model: Any,
+    prefix: List[str],
+    names: List[str],
+    nested: Optional[Type[Serializer]],
+    dotted: str,
+    seen: Set[Type[Serializer]],
+):
+    path = list(prefix)
+    for name in names:
+        try:
+            relation = _get_relation(model, name)
+        except LookupError:
+            # a property or a method, it may read anything
+            explanation.opaque.append(dotted)
+            return
+        path.append(name)
+        if relation is None:
+            return
+        if relation.related_model is None:
+            # a GenericForeignKey, the model of the object is only known per object
+            explanation.opaque.append(dotted)
+            return
+        many = relation.many_to_many or relation.one_to_many
+        explanation.relations.append(
+            Relation(
+                "__".join(path), _relation_kind(relation), many, coverage.covered_by(path, relation)
+            )
+        )
+        model = relation.related_model
+
+    if nested is not None and nested not in seen:
+        _walk(explanation, coverage, nested, model, path, seen | {nested})
+
+
+def explain(serializer_cls: Type[Serializer], model_or_queryset: Any) -> Explanation:
+    """Estimate the queries ``serializer_cls`` runs on the objects of a
+    Django model or QuerySet, without running any.
+
+    Every relation read by the serializer, through nested serializers or
+    dotted ``attr`` fields, is reported with whether the ``select_related``
+    and ``prefetch_related`` calls of the QuerySet cover it. `MethodField`
+    fields can't be analyzed and are reported as opaque.
+
+    Example:
+    ```py
+    explanation = PostSerializer.explain(Post.objects.select_related("author"))
+    print(explanation)
+    # PostSerializer on Post
+    #   author  forward  select_related
+    #   tags    m2m      N+1
+    #   queries: 1 + 1 per object
+    assert explanation.n_plus_one == ["tags"]
+    ```
+    :param serializer_cls: The `Serializer` to analyze.
+    :param model_or_queryset: A Django model, manager or QuerySet.
+    """
+    queryset = None
+    model = model_or_queryset
+    if hasattr(model_or_queryset, "get_queryset"):
+        # a manager
+        model_or_queryset = model_or_queryset.get_queryset()
+    if hasattr(model_or_queryset, "query"):
+        queryset = model_or_queryset
+        model = queryset.model
+
+    explanation = Explanation(serializer_cls, model)
+    _walk(explanation, _Coverage(queryset), serializer_cls, model, [], {serializer_cls})
+    return explanation
@@ -0,0 +1,184 @@
+import copy
+import csv
+import io
+from itertools import islice
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Tuple
+
+from drf_serpy.encoders import JSONFragment, dumps
+from drf_serpy.lazy import LazyList
+from drf_serpy.serializer import Serializer, _iter_instances
+
+#: The number of bytes buffered before they are written or yielded.
+BUFFER_SIZE = 256 * 1024
+
+
+def iter_rows(serializer: Serializer) -> Iterator[Dict]:
+    """Serialize the objects of ``serializer`` one at a time, without
+    building the list of ``Serializer.data``.
+
+    Django QuerySets are fetched with ``QuerySet.iterator`` in chunks of
+    ``Serializer.chunk_size`` rows, and batch fields are resolved for each
+    chunk, so the memory used doesn't depend on the number of objects.
+    ``lazy`` and ``sideload`` are ignored.
+
+    :param serializer: A `Serializer` instance, usually with ``many=True``.
+    """
+    bound = copy.copy(serializer)
+    bound.lazy = bound.sideload = False
+    instances = bound.instance if bound.many else [bound.instance]
+    if bound._recursive_fields:
+        # trees are serialized level by level, one root at a time
+        bound.many = False
+        for instance in _iter_instances(instances, bound.chunk_size):
+            yield bound.to_value(instance)
+        return
+
+    fields = bound._compiled_fields
+    if bound._per_call_fields or bound.omit_none:
+        fields = bound._prepare_fields(fields)
+    serialize = bound._serialize_sparse if bound.omit_none else bound._serialize
+    if bound.model is not None:
+        bound._check_deferred(instances)
+    if bound._annotations:
+        instances = bound.optimize_queryset(instances)
+    instances = _iter_instances(instances, bound.chunk_size)
+    if not bound._batch_fields:
+        for instance in instances:
+            yield serialize(instance, fields)
+        return
+
+    instances = iter(instances)
+    while True:
+        chunk = list(islice(instances, bound.chunk_size))
+        if not chunk:
+            return
+        chunk_fields = bound._prepare_batch_fields(fields, chunk)
+        for instance in chunk:
+            yield serialize(instance, chunk_fields)
+
+
+def iter_ndjson(serializer: Serializer, buffer_size: int = BUFFER_SIZE) -> Iterator[bytes]:
+    """Encode the objects of ``serializer`` as newline delimited JSON, one
+    object per line, and yield the output in chunks of about ``buffer_size``
+    bytes, e.g. for a Django ``StreamingHttpResponse``.
+
+    Example:
+    ```py
+    def export(request):
+        serializer = PostSerializer(Post.objects.all(), many=True)
+        return StreamingHttpResponse(
+            drf_serpy.export.iter_ndjson(serializer), content_type="application/x-ndjson"
+        )
+    ```
+    :param serializer: A `Serializer` instance, usually with ``many=True``.
+    :param int buffer_size: The size of the yielded chunks.
+    """
+    buffer = bytearray()
+    for row in iter_rows(serializer):
+        buffer += dumps(row)
+        buffer += b"\n"
+        if len(buffer) >= buffer_size:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+
+def _get_columns(serializer: Serializer, prefix: str = "") -> List[Tuple[str, Tuple[str, ...]]]:
+    # the dotted column name and the keys of the value of each column
+    nested_fields = dict(serializer._nested_fields)
+    columns = []
+    for index, (name, *_) in enumerate(serializer._compiled_fields):
+        nested = nested_fields.get(index)
+        if nested is not None and not nested.many and nested._compiled_fields:
+            # nested objects are flattened, lists of them are written as JSON
+            columns.extend(
+                (column, (name,) + keys)
+                for column, keys in _get_columns(nested, "{0}{1}.".format(prefix, name))
+            )
+        else:
+            columns.append((prefix + name, (name,)))
+    return columns
+
+
+def _get_cell(row: Dict, keys: Tuple[str, ...]) -> Any:
+    for key in keys:
+        if row is None:
+            break
+        row = row.get(key)
+    if row is None:
+        return ""
+    if isinstance(row, (dict, list, LazyList)):
+        return dumps(row).decode("utf-8")
+    if isinstance(row, JSONFragment):
+        return row.decode("utf-8")
+    return row
+
+
+def iter_csv(
+    serializer: Serializer, buffer_size: int = BUFFER_SIZE, header: bool = True, **fmtparams
+) -> Iterator[bytes]:
+    """Write the objects of ``serializer`` as UTF-8 CSV and yield the output
+    in chunks of about ``buffer_size`` bytes.
+
+    Nested serializers are flattened to dotted column names, e.g.
+    ``author.username``, and lists, like the objects of nested serializers
+    with ``many=True``, are written as JSON. Missing and ``None`` values are
+    written as empty cells.
+
+    :param serializer: A `Serializer` instance, usually with ``many=True``.
+    :param int buffer_size: The size of the yielded chunks.
+    :param bool header: Whether to write the column names first.
+    :param fmtparams: Passed to ``csv.writer``, e.g. ``delimiter=";"``.
+    """
+    columns = _get_columns(serializer)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, **fmtparams)
+    if header:
+        writer.writerow([column for column, _ in columns])
+    paths = [keys for _, keys in columns]
+    for row in iter_rows(serializer):
+        writer.writerow([_get_cell(row, keys) for keys in paths])
+        if buffer.tell() >= buffer_size:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def _write(chunks: Iterable[bytes], file: BinaryIO):
+    write = file.write
+    for chunk in chunks:
+        write(chunk)
+
+
+def write_ndjson(serializer: Serializer, file: BinaryIO, buffer_size: int = BUFFER_SIZE):
+    """Write the objects of ``serializer`` to the binary ``file`` as newline
+    delimited JSON, see `iter_ndjson`.
+
+    Example:
+    ```py
+    with open("posts.ndjson", "wb") as file:
+        drf_serpy.export.write_ndjson(PostSerializer(Post.objects.all(), many=True), file)
+    ```
+    """
+    _write(iter_ndjson(serializer, buffer_size), file)
+
+
+def write_csv(
+    serializer: Serializer,
+    file: BinaryIO,
+    buffer_size: int = BUFFER_SIZE,
+    header: bool = True,
+    **fmtparams,
+):
+    """Write the objects of ``serializer`` to the binary ``file`` as CSV, see `iter_csv`.
+
+    Example:
+    ```py
+    with open("posts.csv", "wb") as file:
+        drf_serpy.export.write_csv(PostSerializer(Post.objects.all(), many=True), file)
+    ```
+    """
+    _write(iter_csv(serializer, buffer_size, header, **fmtparams), file)
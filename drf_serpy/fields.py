@@ -1,11 +1,17 @@
-import importlib
+import binascii
+import importlib.util
+import operator
 import types
 from datetime import date, datetime, time
-from typing import Any, Callable, List, Type, Union
+from decimal import ROUND_HALF_EVEN, Decimal
+from enum import Enum
+from typing import Any, Callable, Dict, List, Mapping, Tuple, Type, Union
 from urllib.parse import urljoin
 
 from drf_yasg import openapi
 
+from drf_serpy.encoders import JSONFragment
+
 settings = None  # noqa
 # if django module exist, import settings from it
 if importlib.util.find_spec("django.conf"):  # noqa
@@ -13,6 +19,97 @@ if importlib.util.find_spec("django.conf"):  # noqa
     from django.conf import settings  # noqa
 
 
+def _get_setting(name: str, default: Any) -> Any:
+    # settings may be missing or not configured yet when serializers are imported
+    if settings is None or not settings.configured:
+        return default
+    return getattr(settings, name, default)
+
+
+SCHEMA_MAPPER = {
+    str: openapi.TYPE_STRING,
+    int: openapi.TYPE_INTEGER,
+    float: openapi.TYPE_NUMBER,
+    bool: openapi.TYPE_BOOLEAN,
+}
+
+
+def _missing(obj: Any):
+    raise KeyError
+
+
+def _get_id_attr(serializer_cls: Type["Serializer"], attr: str) -> str:
+    """Return the attribute holding the key of the related object at ``attr``.
+
+    With a Django ``model`` on the serializer the concrete column of the
+    foreign key is looked up, e.g. ``author_id``, and a relation without one
+    falls back to the ``pk`` of the related object. Otherwise ``'<attr>_id'``.
+    """
+    model = getattr(serializer_cls, "model", None)
+    if model is None:
+        return "{0}_id".format(attr)
+    *path, name = attr.split(".")
+    for part in path:
+        model = model._meta.get_field(part).related_model
+    field = model._meta.get_field(name)
+    if not field.is_relation:
+        raise ValueError("{0}.{1} is not a relation".format(model.__name__, name))
+    if field.concrete and not field.many_to_many:
+        return ".".join(path + [field.attname])
+    return "{0}.pk".format(attr)
+
+
+def _resolve_related_manager(related: Any) -> Any:
+    # a related manager, `.all()` returns the prefetched QuerySet if there is one
+    if not hasattr(related, "_result_cache") and hasattr(related, "all"):
+        return related.all()
+    return related
+
+
+def _related_pks_getter(related_getter: Callable, pk_attr: str, pk_getter: Callable) -> Callable:
+    # the primary keys of a to-many relation, without loading the related rows
+    def getter(instance: Any) -> List[Any]:
+        related = _resolve_related_manager(related_getter(instance))
+        if getattr(related, "_result_cache", True) is None:
+            return list(related.values_list(pk_attr, flat=True))
+        return [pk_getter(o) for o in related]
+
+    return getter
+
+
+class Loader(object):
+    """`Loader` loads related objects in batches for fields with a ``loader``.
+
+    Subclass it and override `Loader.load_many`, any function taking a list
+    of keys and returning a mapping can be used as a loader as well. For
+    example, with SQLAlchemy:
+    ```py
+    class UserLoader(Loader):
+        def __init__(self, session):
+            self.session = session
+
+        def load_many(self, keys):
+            users = self.session.scalars(select(User).where(User.id.in_(keys)))
+            return {user.id: user for user in users}
+
+    class PostSerializer(Serializer):
+        author = UserSerializer(loader=UserLoader(session))
+    ```
+    """
+
+    def load_many(self, keys: List[Any]) -> Mapping[Any, Any]:
+        """Return a mapping of each of the ``keys`` to its object.
+
+        Keys that can't be found should be left out of the mapping.
+
+        :param list keys: The distinct keys to load.
+        """
+        raise NotImplementedError
+
+    def __call__(self, keys: List[Any]) -> Mapping[Any, Any]:
+        return self.load_many(keys)
+
+
 class Field(object):
     """`Field` is used to define what attributes will be serialized.
 
@@ -32,13 +129,27 @@ class Field(object):
         `Field.to_value` will not be called if the value is ``None``.
     :param openapi.Schema schema_type: drf-yasg schema type of the Field, if ``None``,
         schema type of the attribute of the `Field` will be used,
+    :param loader: A `Loader`, or a function taking a list of keys and
+        returning a mapping of each key to its object. The keys of all the
+        serialized objects are collected and loaded at once, see `Field.prepare_batch`.
+    :param key: The attribute holding the key to load, defaults to
+        ``'<attr>_id'``. Can also be a function taking the object.
     """
 
     #: Set to ``True`` if the value function returned from
     #: `Field.as_getter` requires the serializer to be passed in as the
     #: first argument. Otherwise, the object will be the only parameter.
     getter_takes_serializer = False
+    #: Set to ``True`` if the value of the field doesn't depend on the object
+    #: being serialized. The getter returned from `Field.as_getter` is then
+    #: called once per serialization call with the `Serializer` instance,
+    #: and its value is reused for every object. See `Field.prepare`.
+    per_call = False
+    #: Set to ``True`` if the field is resolved for all the objects of a
+    #: serialization call at once. See `Field.prepare_batch`.
+    batch = False
     schema_type = None
+    schema_format = None
 
     def __init__(
         self,
@@ -47,12 +158,18 @@ class Field(object):
         label: str = None,
         required: bool = True,
         schema_type: Type[openapi.Schema] = None,
+        loader: Callable[[List[Any]], Mapping[Any, Any]] = None,
+        key: Union[str, Callable[[Any], Any]] = None,
     ):
         self.attr = attr
         self.call = call
         self.label = label
         self.required = required
         self.schema_type = schema_type or self.schema_type
+        self.loader = loader
+        self.key = key
+        if loader is not None:
+            self.batch = True
 
     def to_value(self, value: Type[Any]) -> Union[dict, list, bool, str, int, float]:
         """Transform the serialized value.
@@ -97,8 +214,97 @@ class Field(object):
             on the serializer.
         :param serializer_cls: The `Serializer` this field is a part of.
         """
+        if self.loader is not None:
+            # fields with a loader get the key to load from the object
+            key = self.key or _get_id_attr(serializer_cls, self.attr or serializer_field_name)
+            return key if callable(key) else serializer_cls.default_getter(key)
         return None
 
+    def prepare(self, serializer: Type["Serializer"], compiled_field: Tuple) -> Tuple:
+        """Evaluate a ``per_call`` field once for a serialization call.
+
+        Returns the compiled field used for every object serialized by the
+        call.
+
+        :param serializer: The `Serializer` instance that is serializing.
+        :param tuple compiled_field: The field as compiled on the serializer class.
+        """
+        name, getter, to_value, call, required, _ = compiled_field
+        try:
+            value = getter(serializer)
+        except (KeyError, AttributeError):
+            if required:
+                raise
+            # an optional field without a value is left out of every object
+            return (name, _missing, None, False, False, False)
+        if required or value is not None:
+            if call:
+                value = value()
+            if to_value:
+                value = to_value(value)
+        return (name, lambda obj: value, None, False, True, False)
+
+    def prepare_batch(
+        self, serializer: Type["Serializer"], compiled_field: Tuple, instances: List[Any]
+    ) -> Tuple:
+        """Resolve a ``batch`` field for all the objects of a serialization call.
+
+        Returns the compiled field used for every object serialized by the
+        call, its getter is called with each object.
+
+        By default, the keys of all the objects are collected and the
+        ``loader`` of the field is called once with them.
+
+        :param serializer: The `Serializer` instance that is serializing.
+        :param tuple compiled_field: The field as compiled on the serializer class.
+        :param list instances: All the objects being serialized.
+        """
+        name, get_key, _, _, required, _ = compiled_field
+        many = getattr(self, "many", False)
+        keys = set()
+        for obj in instances:
+            try:
+                key = get_key(obj)
+            except (KeyError, AttributeError):
+                if required:
+                    raise
+                continue
+            if many:
+                keys.update(key)
+            else:
+                keys.add(key)
+        keys.discard(None)
+        values = self.load(serializer, list(keys))
+
+        if many:
+            return (
+                name,
+                lambda obj: [values[k] for k in get_key(obj)],
+                None,
+                False,
+                required,
+                False,
+            )
+
+        def getter(obj: Any) -> Any:
+            key = get_key(obj)
+            return None if key is None else values[key]
+
+        return (name, getter, None, False, required, False)
+
+    def load(self, serializer: Type["Serializer"], keys: List[Any]) -> Dict[Any, Any]:
+        """Load ``keys`` with the ``loader`` of the field and return a mapping
+        of each key to its serialized value.
+
+        :param serializer: The `Serializer` instance that is serializing.
+        :param list keys: The distinct keys of all the objects being serialized.
+        """
+        loaded = self.loader(keys) if keys else {}
+        if not self._is_to_value_overridden():
+            return loaded
+        to_value = self.to_value
+        return {k: v if v is None else to_value(v) for k, v in loaded.items()}
+
     def get_schema(self) -> Union[None, openapi.Schema]:
         """get the openapi.Schema of the field
 
@@ -109,6 +315,7 @@ class Field(object):
             return
         return openapi.Schema(
             type=self.schema_type,
+            format=self.schema_format,
         )
 
 
@@ -162,16 +369,20 @@ class MethodField(Field):
     ```
     :param str method: The method on the serializer to call. Defaults to
         ``'get_<field name>'``.
+    :param bool per_call: If ``True``, the method doesn't depend on the object
+        and is called with the serializer only, once per serialization call,
+        e.g. ``def get_currency(self) -> str``.
     """
 
     getter_takes_serializer = True
 
-    def __init__(self, method: str = None, **kwargs):
+    def __init__(self, method: str = None, per_call: bool = False, **kwargs):
         assert (
             kwargs.pop("schema_type", None) is None
         ), f"MethodField doesn't take a schema_type param, use type annotations in your methods to generate schema"
         super(MethodField, self).__init__(**kwargs)
         self.method = method
+        self.per_call = per_call
 
     def as_getter(self, serializer_field_name: str, serializer_cls: Type[Field]) -> Callable:
         method_name = self.method
@@ -180,6 +391,248 @@ class MethodField(Field):
         return getattr(serializer_cls, method_name)
 
 
+class BatchMethodField(MethodField):
+    """A `MethodField` whose method is called once with all the objects.
+
+    The method returns a mapping from each object (or its ``key`` attribute)
+    to its value, so aggregates can be fetched with a single query instead of
+    one query per object:
+    ```py
+    class PostSerializer(Serializer):
+        comment_count = BatchMethodField(key="pk")
+
+        def get_comment_count(self, posts) -> Dict[int, int]:
+            counts = (
+                Comment.objects.filter(post__in=posts)
+                .values_list("post_id")
+                .annotate(count=Count("pk"))
+            )
+            return defaultdict(int, counts)
+    ```
+    Objects missing from the mapping raise a ``KeyError``, or are left out if
+    the field isn't ``required``. On a nested serializer, the method is called
+    once with the related objects of all the serialized objects.
+
+    :param str method: The method on the serializer to call. Defaults to
+        ``'get_<field name>'``.
+    :param str key: The attribute of each object used to look it up in the
+        mapping. Defaults to the object itself.
+    """
+
+    batch = True
+
+    def __init__(self, method: str = None, key: str = None, **kwargs):
+        super().__init__(method, **kwargs)
+        self.key = key
+
+    def prepare_batch(
+        self, serializer: Type["Serializer"], compiled_field: Tuple, instances: List[Any]
+    ) -> Tuple:
+        name, getter, to_value, call, required, _ = compiled_field
+        values = getter(serializer, instances)
+        if self.key is None:
+            return (name, values.__getitem__, to_value, call, required, False)
+        key = serializer.default_getter(self.key)
+        return (name, lambda obj: values[key(obj)], to_value, call, required, False)
+
+
+class ConstField(Field):
+    """A `Field` that always serializes to the same value.
+
+    The value is resolved once per serialization call instead of once per
+    object, e.g. ``version = ConstField(2)``.
+
+    :param value: The value to serialize.
+    """
+
+    per_call = True
+
+    def __init__(self, value: Any, **kwargs):
+        if kwargs.get("schema_type") is None:
+            kwargs["schema_type"] = SCHEMA_MAPPER.get(type(value))
+        super().__init__(**kwargs)
+        self.value = value
+
+    def as_getter(self, serializer_field_name: str, serializer_cls: Type["Serializer"]) -> Callable:
+        value = self.value
+        return lambda serializer: value
+
+
+class ContextField(Field):
+    """A `Field` that serializes a value from the serializer's ``context``.
+
+    The value is resolved once per serialization call instead of once per
+    object. For example, with ``context={"currency": "EUR"}``:
+    ```py
+    class PriceSerializer(Serializer):
+        amount = FloatField()
+        currency = ContextField(schema_type=openapi.TYPE_STRING)
+        rate = ContextField(lambda context: context["rates"][context["currency"]])
+    ```
+    :param key: The key to get from the context, defaults to the name of the
+        field. Can also be a function taking the context.
+    """
+
+    per_call = True
+
+    def __init__(self, key: Union[str, Callable[[dict], Any]] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.key = key
+
+    def as_getter(self, serializer_field_name: str, serializer_cls: Type["Serializer"]) -> Callable:
+        key = self.key or self.attr or serializer_field_name
+        if callable(key):
+            return lambda serializer: key(serializer.context or {})
+        return lambda serializer: (serializer.context or {})[key]
+
+
+class RelatedIdField(Field):
+    """A `Field` that serializes the primary key of a related object.
+
+    The key is read from the foreign key column, ``author_id`` for an
+    ``author`` relation, so the related object is never loaded. With a
+    Django ``model`` set on the `Serializer` the column is looked up on the
+    model when the serializer is compiled. With ``many=True`` the keys of a
+    to-many relation are read from its prefetched objects, or fetched with
+    a single ``values_list`` query if it isn't prefetched:
+
+    Example:
+    ```py
+    class PostSerializer(Serializer):
+        model = Post
+
+        author = RelatedIdField()
+        tags = RelatedIdField(many=True)
+
+    PostSerializer(post).data
+    # {'author': 1, 'tags': [3, 4]}
+    ```
+    :param bool many: Whether the relation is a to-many relation.
+    :param str key: The attribute holding the key of a to-one relation.
+        Defaults to the column of the foreign key.
+    :param str pk_attr: The attribute holding the key of each related object
+        of a to-many relation.
+    """
+
+    schema_type = openapi.TYPE_INTEGER
+
+    def __init__(self, many: bool = False, pk_attr: str = "pk", **kwargs):
+        super().__init__(**kwargs)
+        self.many = many
+        self.pk_attr = pk_attr
+
+    def as_getter(self, serializer_field_name: str, serializer_cls: Type["Serializer"]) -> Callable:
+        attr = self.attr or serializer_field_name
+        if self.many:
+            return _related_pks_getter(
+                serializer_cls.default_getter(attr),
+                self.pk_attr,
+                serializer_cls.default_getter(self.pk_attr),
+            )
+        key = self.key or _get_id_attr(serializer_cls, attr)
+        return key if callable(key) else serializer_cls.default_getter(key)
+
+    def get_schema(self) -> openapi.Schema:
+        if self.many:
+            return openapi.Schema(
+                type=openapi.TYPE_ARRAY, items=openapi.Items(type=self.schema_type)  # noqa
+            )
+        return super().get_schema()
+
+
+# schema types of the internal types of Django model fields
+_DJANGO_SCHEMA_TYPES = {
+    "AutoField": openapi.TYPE_INTEGER,
+    "BigAutoField": openapi.TYPE_INTEGER,
+    "BigIntegerField": openapi.TYPE_INTEGER,
+    "IntegerField": openapi.TYPE_INTEGER,
+    "PositiveBigIntegerField": openapi.TYPE_INTEGER,
+    "PositiveIntegerField": openapi.TYPE_INTEGER,
+    "PositiveSmallIntegerField": openapi.TYPE_INTEGER,
+    "SmallIntegerField": openapi.TYPE_INTEGER,
+    "BooleanField": openapi.TYPE_BOOLEAN,
+    "FloatField": openapi.TYPE_NUMBER,
+}
+
+
+class AnnotatedField(Field):
+    """A `Field` computed by the database with a Django ORM expression.
+
+    The expression is added to the QuerySet with ``annotate`` by
+    `Serializer.optimize_queryset`, which is applied automatically to the
+    QuerySets serialized with ``many=True``, and the field reads the
+    annotated attribute. Aggregates like counts are then computed by a
+    single SQL statement instead of a query per object:
+
+    Example:
+    ```py
+    class PostSerializer(Serializer):
+        comment_count = AnnotatedField(Count("comment"))
+        is_commented = AnnotatedField(
+            Exists(Comment.objects.filter(post=OuterRef("pk")))
+        )
+
+    PostSerializer(Post.objects.all(), many=True).data
+    # [{'comment_count': 3, 'is_commented': True}, ...]
+    ```
+    To serialize a single object, fetch it from an optimized QuerySet, e.g.
+    ``PostSerializer.optimize_queryset(Post.objects.all()).get(pk=pk)``.
+
+    :param expression: The ORM expression annotated as ``attr``, or as the
+        name of the field.
+    """
+
+    def __init__(self, expression: Any, **kwargs):
+        super().__init__(**kwargs)
+        self.expression = expression
+        if self.schema_type is None:
+            try:
+                internal_type = expression.output_field.get_internal_type()
+            except Exception:  # noqa
+                # the output field of some expressions is only known once resolved
+                internal_type = None
+            self.schema_type = _DJANGO_SCHEMA_TYPES.get(internal_type, openapi.TYPE_STRING)
+
+
+class RecursiveField(Field):
+    """A `Field` serializing related objects with the serializer it is
+    declared on, e.g. for threaded comments or category trees.
+
+    Trees are serialized level by level with the compiled fields of the
+    serializer, without a serializer instance or a Python frame per node,
+    so their depth isn't bound by the recursion limit, and the batch fields
+    of the serializer are resolved once for each level:
+
+    Example:
+    ```py
+    class CategorySerializer(Serializer):
+        name = StrField()
+        children = RecursiveField(many=True, max_depth=10)
+
+    CategorySerializer(root).data
+    # {'name': 'root', 'children': [{'name': 'a', 'children': []}, ...]}
+    ```
+    :param bool many: Whether the attribute holds a collection of objects.
+    :param int max_depth: The number of levels serialized below the object
+        passed to the serializer, the field is left out of the deepest ones.
+        Unlimited by default, which never ends if the objects form a cycle.
+    """
+
+    schema_type = openapi.TYPE_OBJECT
+
+    def __init__(self, many: bool = False, max_depth: int = None, **kwargs):
+        super().__init__(**kwargs)
+        self.many = many
+        self.max_depth = max_depth
+
+    def get_schema(self) -> openapi.Schema:
+        if self.many:
+            return openapi.Schema(
+                type=openapi.TYPE_ARRAY, items=openapi.Items(type=self.schema_type)  # noqa
+            )
+        return super().get_schema()
+
+
 class ImageField(Field):
     """A `Field` that converts the value to a image url."""
 
@@ -247,3 +700,224 @@ class DateTimeField(DateField):
 
     date_format = "%Y-%m-%dT%H:%M:%S.%fZ"
     schema_type = openapi.TYPE_STRING
+
+
+def _format_decimal(value: Union[Decimal, float, int]) -> str:
+    # in fixed-point notation like DRF, str() gives "1E+3" for Decimal("1E+3")
+    if not isinstance(value, Decimal):
+        value = Decimal(str(value))
+    return format(value, "f")
+
+
+class DecimalField(Field):
+    """A `Field` that converts a ``Decimal`` to a string, or to a float.
+
+    :param int decimal_places: Quantize the value to this number of decimal
+        places. By default the value is converted as it is, in fixed-point
+        notation, which is the fastest.
+    :param str rounding: The ``decimal`` rounding mode used to quantize.
+    :param bool coerce_to_string: Serialize the value as a string, which keeps
+        its precision, instead of a float.
+    """
+
+    schema_type = openapi.TYPE_STRING
+    schema_format = openapi.FORMAT_DECIMAL
+
+    def __init__(
+        self,
+        decimal_places: int = None,
+        rounding: str = ROUND_HALF_EVEN,
+        coerce_to_string: bool = True,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.decimal_places = decimal_places
+        self.rounding = rounding
+        self.coerce_to_string = coerce_to_string
+        if not coerce_to_string:
+            self.schema_type = openapi.TYPE_NUMBER
+            self.schema_format = None
+        if decimal_places is None:
+            self.to_value = _format_decimal if coerce_to_string else float
+        else:
+            self.exponent = Decimal(1).scaleb(-decimal_places)
+
+    def to_value(self, value: Union[Decimal, float, int]) -> Union[str, float]:
+        if not isinstance(value, Decimal):
+            # floats are converted from their shortest repr, not their binary value
+            value = Decimal(str(value))
+        value = value.quantize(self.exponent, rounding=self.rounding)
+        return format(value, "f") if self.coerce_to_string else float(value)
+
+
+class UUIDField(Field):
+    """A `Field` that converts a ``UUID`` to its canonical string form.
+
+    :param bool hex: Serialize the 32 hex digits without the dashes instead.
+    """
+
+    to_value = staticmethod(str)
+    schema_type = openapi.TYPE_STRING
+    schema_format = openapi.FORMAT_UUID
+
+    def __init__(self, hex: bool = False, **kwargs):
+        super().__init__(**kwargs)
+        if hex:
+            self.to_value = operator.attrgetter("hex")
+
+
+class EnumField(Field):
+    """A `Field` that serializes an ``Enum`` member, e.g. a Django ``TextChoices``
+    or ``IntegerChoices`` value, to its value or its name.
+
+    Django model fields hold the raw value once they are loaded from the
+    database, so raw values are accepted as well. With ``enum_cls`` the
+    schema lists the possible values, and raw values can be serialized by name.
+
+    Example:
+    ```py
+    class PostSerializer(Serializer):
+        status = EnumField(Post.Status)
+        status_name = EnumField(Post.Status, attr="status", by_name=True)
+    ```
+    :param enum_cls: The ``Enum`` class of the values.
+    :param bool by_name: Serialize the name of the member instead of its value.
+    """
+
+    schema_type = openapi.TYPE_STRING
+
+    def __init__(self, enum_cls: Type[Enum] = None, by_name: bool = False, **kwargs):
+        super().__init__(**kwargs)
+        self.enum_cls = enum_cls
+        self.by_name = by_name
+        self.member_attr = "name" if by_name else "value"
+        self.lookup = {}
+        if enum_cls is not None:
+            values = [member.value for member in enum_cls]
+            if not by_name:
+                self.schema_type = SCHEMA_MAPPER.get(type(values[0]), openapi.TYPE_STRING)
+            # a dict lookup handles both members and raw values in one step
+            for member in enum_cls:
+                self.lookup[member.value] = getattr(member, self.member_attr)
+                self.lookup[member] = getattr(member, self.member_attr)
+        elif by_name:
+            raise ValueError("EnumField needs an enum_cls to serialize raw values by name")
+
+    def to_value(self, value: Any) -> Any:
+        lookup = self.lookup
+        if lookup:
+            try:
+                return lookup[value]
+            except (KeyError, TypeError):
+                # raises ValueError for unknown values, handles aliases and `_missing_`
+                value = self.enum_cls(value)
+        return getattr(value, self.member_attr, value)
+
+    def get_schema(self) -> openapi.Schema:
+        if self.enum_cls is None:
+            return super().get_schema()
+        return openapi.Schema(
+            type=self.schema_type,
+            enum=[getattr(member, self.member_attr) for member in self.enum_cls],
+        )
+
+
+class JSONField(Field):
+    """A `Field` for JSON values, e.g. of a Django ``JSONField``.
+
+    Decoded values are returned as they are. Set ``encoded`` if the attribute
+    holds JSON text (e.g. a text column, or a ``KeyTextTransform`` annotation)
+    to return it as a `drf_serpy.JSONFragment`, which
+    `drf_serpy.renderers.SerpyJSONRenderer` writes without decoding it.
+
+    :param bool encoded: Whether the value is already encoded JSON.
+    """
+
+    schema_type = openapi.TYPE_OBJECT
+
+    def __init__(self, encoded: bool = False, **kwargs):
+        super().__init__(**kwargs)
+        self.encoded = encoded
+        if encoded:
+            self.to_value = JSONFragment
+
+
+class Base64Field(Field):
+    """A `Field` that encodes binary data to base64, e.g. of a Django
+    ``BinaryField`` or a ``FileField``.
+
+    The value can be ``bytes``, a ``memoryview`` (as returned by some database
+    drivers for binary columns) or a file-like object. Buffers are encoded
+    with ``binascii.b2a_base64`` directly, without being copied to ``bytes``
+    first, and files are read and encoded in chunks of ``chunk_size`` bytes
+    into a single output buffer.
+
+    With ``fragment`` set the value is returned as a `drf_serpy.JSONFragment`
+    holding the quoted base64 text, which `drf_serpy.encoders.dumps` and
+    `drf_serpy.renderers.SerpyJSONRenderer` write to the output as it is,
+    instead of copying and escaping a string.
+
+    Example:
+    ```py
+    class AttachmentSerializer(Serializer):
+        thumbnail = Base64Field()
+        document = Base64Field(fragment=True, required=False)
+    ```
+    :param bool urlsafe: Use the URL and filename safe alphabet, ``-`` and
+        ``_`` instead of ``+`` and ``/``.
+    :param bool fragment: Return a `drf_serpy.JSONFragment` instead of a ``str``.
+    :param int chunk_size: The number of bytes read from a file at a time,
+        rounded down to a multiple of 3 so the chunks encode without padding.
+    """
+
+    schema_type = openapi.TYPE_STRING
+    schema_format = openapi.FORMAT_BASE64
+
+    def __init__(
+        self, urlsafe: bool = False, fragment: bool = False, chunk_size: int = 48 * 1024, **kwargs
+    ):
+        super().__init__(**kwargs)
+        self.urlsafe = urlsafe
+        self.fragment = fragment
+        self.chunk_size = max(3, chunk_size - chunk_size % 3)
+
+    def _encode_file(self, file: Any, output: bytearray):
+        # every chunk but the last is filled up, so only the end of the output is padded
+        chunk_size = self.chunk_size
+        buffer = memoryview(bytearray(chunk_size))
+        readinto = getattr(file, "readinto", None)
+        size = 0
+        while True:
+            if readinto is not None:
+                read = readinto(buffer[size:])
+            else:
+                data = file.read(chunk_size - size)
+                read = len(data)
+                buffer[size : size + read] = data
+            size += read
+            if read and size < chunk_size:
+                continue
+            if size:
+                output += binascii.b2a_base64(buffer[:size], newline=False)
+            if not read:
+                break
+            size = 0
+
+    def to_value(self, value: Union[bytes, memoryview, Any]) -> Union[str, JSONFragment]:
+        if hasattr(value, "read"):
+            output = bytearray(b'"') if self.fragment else bytearray()
+            self._encode_file(value, output)
+        elif self.fragment:
+            output = bytearray(b'"')
+            output += binascii.b2a_base64(value, newline=False)
+        else:
+            output = binascii.b2a_base64(value, newline=False)
+        if self.urlsafe:
+            output = output.translate(_URLSAFE_BASE64)
+        if self.fragment:
+            output += b'"'
+            return JSONFragment(output)
+        return output.decode("ascii")
+
+
+_URLSAFE_BASE64 = bytes.maketrans(b"+/", b"-_")
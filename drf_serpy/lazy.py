@@ -0,0 +1,136 @@
+from collections.abc import Sequence
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Union
+
+_unset = object()
+
+
+class LazyList(Sequence):
+    """The result of a ``many=True`` `Serializer` with ``lazy=True``.
+
+    Objects are fetched and serialized as their rows are accessed, and the
+    rows are cached for later accesses, so slicing the result or streaming it
+    only costs what is actually used:
+
+    Example:
+    ```py
+    data = PostSerializer(Post.objects.all(), many=True, lazy=True).data
+    data[:10]  # fetches and serializes the first 10 posts
+    for row in data: ...  # fetches and serializes the posts one at a time
+    len(data)  # fetches the remaining posts, serializes none
+    ```
+
+    ``len`` and negative indexes fetch every object. Once a row is serialized
+    the result no longer holds its object, so iterating over the whole
+    result keeps the same rows in memory as a list would. Slices are returned
+    as lists; `drf_serpy.encoders.dumps` writes the result as a JSON array,
+    and so does DRF's encoder, through `LazyList.tolist`.
+
+    :param instances: The objects to serialize.
+    :param bind: Called once with the list of all the objects, returns the
+        function serializing one object. Used when the objects have to be
+        known up front, e.g. by batch fields; every object is fetched on the
+        first access.
+    :param serialize: The function serializing one object, used instead of
+        ``bind`` to fetch the objects incrementally.
+    """
+
+    def __init__(
+        self,
+        instances: Iterable,
+        bind: Callable[[List[Any]], Callable[[Any], Dict]] = None,
+        serialize: Callable[[Any], Dict] = None,
+    ):
+        if (bind is None) == (serialize is None):
+            raise ValueError("pass one of bind or serialize")
+        self._source = instances
+        self._iterator: Optional[Iterator] = None
+        self._bind = bind
+        self._serialize = serialize
+        # the objects whose row isn't serialized yet, None once it is
+        self._instances: List[Any] = []
+        self._rows: List[Any] = []
+
+    def _fetch(self, stop: Optional[int] = None) -> List[Any]:
+        """Fetch the objects up to the index ``stop``, or all of them."""
+        rows = self._rows
+        if self._source is None or (stop is not None and stop <= len(rows)):
+            return rows
+        if self._bind is not None:
+            instances = list(self._source)
+            self._serialize = self._bind(instances)
+            self._source = None
+        else:
+            if self._iterator is None:
+                # iter() evaluates QuerySets, so it waits for the first access
+                self._iterator = iter(self._source)
+            if stop is None:
+                instances = list(self._iterator)
+                self._source = None
+            else:
+                instances = list(islice(self._iterator, stop - len(rows)))
+                if len(instances) < stop - len(rows):
+                    self._source = None
+            if self._source is None:
+                self._iterator = None
+        self._instances.extend(instances)
+        rows.extend([_unset] * len(instances))
+        return rows
+
+    def _get_row(self, rows: List[Any], index: int) -> Dict:
+        row = rows[index]
+        if row is _unset:
+            instances = self._instances
+            row = rows[index] = self._serialize(instances[index])
+            instances[index] = None
+        return row
+
+    def __len__(self) -> int:
+        return len(self._fetch())
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Dict, List[Dict]]:
+        if isinstance(index, slice):
+            start, stop, step = index.start, index.stop, index.step or 1
+            # the rows up to stop, or up to start going backwards, are needed
+            # unless a bound counts from the end
+            if step > 0:
+                bounds, end = (start or 0, stop), stop
+            else:
+                bounds, end = (start, stop or 0), start
+            if None in bounds or min(bounds) < 0:
+                rows = self._fetch()
+            else:
+                rows = self._fetch(end if step > 0 else end + 1)
+            return [self._get_row(rows, i) for i in range(*index.indices(len(rows)))]
+        rows = self._fetch() if index < 0 else self._fetch(index + 1)
+        return self._get_row(rows, index)
+
+    def __iter__(self) -> Iterator[Dict]:
+        index = 0
+        while True:
+            rows = self._rows
+            if index >= len(rows):
+                rows = self._fetch(index + 1)
+                if index >= len(rows):
+                    return
+            yield self._get_row(rows, index)
+            index += 1
+
+    def tolist(self) -> List[Dict]:
+        """Return the rows as a list, which is how DRF's ``JSONEncoder``
+        encodes the result.
+        """
+        return list(self)
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, (list, LazyList)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        if self._source is not None and not self._rows:
+            return "<LazyList (not loaded)>"
+        serialized = sum(row is not _unset for row in self._rows)
+        return "<LazyList {0}/{1}{2} serialized>".format(
+            serialized, len(self._rows), "" if self._source is None else "+"
+        )
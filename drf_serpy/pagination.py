@@ -0,0 +1,339 @@
+import base64
+import binascii
+import json
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import F, Q
+from django.db.models.constants import LOOKUP_SEP
+from django.db.models.fields.files import FieldFile
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from drf_serpy.fields import IntField, StrField
+from drf_serpy.serializer import DictSerializer, Serializer
+
+_WRAPPED_SERIALIZERS = {}
+
+
+class PaginationSerializer(DictSerializer):
+    """`PaginationSerializer` renders the envelope of a paginated response.
+
+    Use `PaginationSerializer.wrap` to build an envelope around any serpy
+    serializer, the returned class can be used both to serialize a page and
+    to generate its swagger schema:
+
+    Example:
+    ```py
+    PaginatedCommentSerializer = PaginationSerializer.wrap(CommentSerializer)
+
+    paginator = KeysetPagination()
+    page = paginator.paginate_queryset(Comment.objects.all(), request)
+    PaginatedCommentSerializer(paginator.get_envelope(page)).data
+    # {'next': '...', 'previous': None, 'results': [...]}
+    ```
+    """
+
+    next = StrField(required=False)
+    previous = StrField(required=False)
+    count = IntField(required=False)
+    results = Serializer(many=True)
+
+    @classmethod
+    def wrap(cls, serializer_cls: Type[Serializer]) -> Type["PaginationSerializer"]:
+        """Return a `PaginationSerializer` subclass whose ``results`` are
+        serialized with ``serializer_cls``.
+
+        The generated classes are cached, so wrapping the same serializer
+        twice returns the same class.
+
+        :param serializer_cls: The serpy `Serializer` used for each result.
+        """
+        key = (cls, serializer_cls)
+        wrapped = _WRAPPED_SERIALIZERS.get(key)
+        if wrapped is None:
+            wrapped = type(cls)(
+                "Paginated{0}".format(serializer_cls.__name__),
+                (cls,),
+                {
+                    "__doc__": serializer_cls.__doc__,
+                    "__module__": serializer_cls.__module__,
+                    "results": serializer_cls(many=True),
+                },
+            )
+            # another thread may have wrapped it meanwhile, keep the first class
+            wrapped = _WRAPPED_SERIALIZERS.setdefault(key, wrapped)
+        return wrapped
+
+
+def _parse_ordering(ordering: str) -> Tuple[str, bool]:
+    if ordering.startswith("-"):
+        return ordering[1:], True
+    return ordering, False
+
+
+def _get_model_field(model: Any, name: str) -> Tuple[Any, bool]:
+    # returns the field at the end of ``name`` and whether any field on the
+    # way to it is nullable
+    field, null = None, False
+    for part in name.split(LOOKUP_SEP):
+        field = model._meta.pk if part == "pk" else model._meta.get_field(part)
+        null = null or field.null
+        model = field.related_model
+        if model is None:
+            break
+    return field, null
+
+
+def _cursor_default(value: Any) -> Optional[str]:
+    if isinstance(value, FieldFile):
+        return value.name
+    # datetimes keep their microseconds, the ORM parses the iso format back
+    isoformat = getattr(value, "isoformat", None)
+    if isoformat is not None:
+        return isoformat()
+    return str(value)
+
+
+class KeysetPagination(BasePagination):
+    """Keyset (a.k.a. seek) pagination for Django QuerySets.
+
+    Instead of ``OFFSET`` scans, every page is fetched with a ``WHERE`` clause
+    built from the ordering values of the last row of the previous page, so
+    deep pages cost the same as the first one as long as the ``ordering``
+    columns are indexed. The ``COUNT(*)`` query is skipped unless
+    ``include_count`` is set.
+
+    The ordering must be unique; the primary key is appended as a tie breaker
+    if it isn't part of ``ordering`` already. ``NULL`` values of nullable
+    columns are sorted after all the others, on every database.
+
+    Example:
+    ```py
+    class CommentPagination(KeysetPagination):
+        ordering = ("-created",)
+        page_size = 50
+    ```
+    """
+
+    #: Number of results on each page.
+    page_size = 100
+    #: Query parameter that allows the client to override ``page_size``.
+    page_size_query_param = None
+    #: Upper bound for a client supplied page size.
+    max_page_size = None
+    #: Query parameter carrying the opaque cursor.
+    cursor_query_param = "cursor"
+    #: Model fields used for the keyset, prefix with ``-`` for descending order.
+    ordering = ("-created",)
+    #: Whether to run a ``COUNT(*)`` query and include it in the envelope.
+    include_count = False
+
+    def paginate_queryset(self, queryset, request, view=None) -> List[Any]:
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering_fields = self.get_ordering(view)
+        self.model_fields = self.get_model_fields(queryset.model)
+        self.count = queryset.count() if self.include_count else None
+
+        cursor = self.decode_cursor(request)
+        reverse = bool(cursor and cursor["r"])
+        ordering = []
+        for (name, desc), (_, null) in zip(self.ordering_fields, self.model_fields):
+            if not null:
+                ordering.append("-" + name if desc ^ reverse else name)
+            elif desc ^ reverse:
+                ordering.append(F(name).desc(nulls_first=True))
+            else:
+                ordering.append(F(name).asc(nulls_last=True))
+        queryset = queryset.order_by(*ordering)
+        if cursor is not None:
+            queryset = queryset.filter(self.get_keyset_filter(cursor["v"], reverse))
+
+        page = list(queryset[: self.page_size + 1])
+        has_more = len(page) > self.page_size
+        del page[self.page_size :]
+        if reverse:
+            page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, cursor is not None
+        self.page = page
+        return page
+
+    def get_page_size(self, request) -> int:
+        if self.page_size_query_param:
+            try:
+                page_size = int(request.query_params[self.page_size_query_param])
+            except (KeyError, ValueError):
+                pass
+            else:
+                if page_size > 0:
+                    if self.max_page_size:
+                        return min(page_size, self.max_page_size)
+                    return page_size
+        return self.page_size
+
+    def get_ordering(self, view=None) -> List[Tuple[str, bool]]:
+        """Return the keyset as a list of ``(field name, descending)`` pairs."""
+        ordering = self.ordering
+        if isinstance(ordering, str):
+            ordering = (ordering,)
+        fields = [_parse_ordering(o) for o in ordering]
+        if not any(name in ("pk", "id") for name, _ in fields):
+            fields.append(("pk", fields[0][1] if fields else False))
+        return fields
+
+    def get_model_fields(self, model: Any) -> List[Tuple[Any, bool]]:
+        """Return the model field of each ordering column and whether the
+        column is nullable. Columns that aren't model fields, e.g. annotations,
+        are returned as ``(None, True)``.
+        """
+        model_fields = []
+        for name, _ in self.ordering_fields:
+            try:
+                model_fields.append(_get_model_field(model, name))
+            except FieldDoesNotExist:
+                model_fields.append((None, True))
+        return model_fields
+
+    def get_keyset_filter(self, values: Sequence[Any], reverse: bool = False) -> Q:
+        """Build the ``WHERE`` clause selecting the rows after ``values``.
+
+        For an ordering of ``(-created, -pk)`` this produces
+        ``created < v0 OR (created = v0 AND pk < v1)``. ``NULL`` sorts after
+        every value, so for a nullable ``created`` the ascending branch reads
+        ``created > v0 OR created IS NULL``, and a ``NULL`` v0 selects
+        ``created IS NOT NULL`` going down and nothing going up.
+        """
+        keyset = Q()
+        equal = Q()
+        for (name, desc), (_, null), value in zip(self.ordering_fields, self.model_fields, values):
+            descending = desc ^ reverse
+            if value is None:
+                after = Q(**{name + "__isnull": False}) if descending else None
+                is_equal = Q(**{name + "__isnull": True})
+            else:
+                after = Q(**{"{0}__{1}".format(name, "lt" if descending else "gt"): value})
+                if null and not descending:
+                    after |= Q(**{name + "__isnull": True})
+                is_equal = Q(**{name: value})
+            if after is not None:
+                keyset |= equal & after
+            equal &= is_equal
+        return keyset
+
+    def encode_cursor(self, row: Any, reverse: bool = False) -> str:
+        # foreign keys are keyed by their column rather than the related object
+        values = [
+            getattr(row, field.attname if field is not None and field.name == name else name)
+            for (name, _), (field, _) in zip(self.ordering_fields, self.model_fields)
+        ]
+        payload = json.dumps({"v": values, "r": reverse}, default=_cursor_default)
+        return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+    def to_python(self, value: Any, field: Any, null: bool) -> Any:
+        """Convert a value read from a cursor with the model field of its
+        column, raising `ValueError` or `ValidationError` if it isn't valid.
+        Values of columns that aren't model fields are used as they are.
+        """
+        if value is None:
+            if not null:
+                raise ValueError("NULL cursor value for a non-nullable column")
+            return None
+        if field is None:
+            return value
+        return field.to_python(value)
+
+    def decode_cursor(self, request) -> Optional[Dict[str, Any]]:
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            payload = base64.urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4))
+            cursor = json.loads(payload.decode("utf-8"))
+            if len(cursor["v"]) != len(self.ordering_fields):
+                raise ValueError(encoded)
+            cursor["v"] = [
+                self.to_python(value, field, null)
+                for value, (field, null) in zip(cursor["v"], self.model_fields)
+            ]
+            cursor["r"] = bool(cursor.get("r"))
+        except (
+            binascii.Error,
+            UnicodeDecodeError,
+            ValueError,
+            KeyError,
+            TypeError,
+            ValidationError,
+        ):
+            raise NotFound("Invalid cursor")
+        return cursor
+
+    def _get_link(self, row: Any, reverse: bool) -> str:
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(row, reverse))
+
+    def get_next_link(self) -> Optional[str]:
+        if not self.has_next or not self.page:
+            return None
+        return self._get_link(self.page[-1], reverse=False)
+
+    def get_previous_link(self) -> Optional[str]:
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.request.build_absolute_uri(), self.cursor_query_param)
+        return self._get_link(self.page[0], reverse=True)
+
+    def get_envelope(self, results: Any) -> Dict[str, Any]:
+        """Return the envelope for the current page with ``results`` in it.
+
+        ``results`` can either be the page itself, to be serialized by a
+        wrapped `PaginationSerializer`, or its already serialized data.
+        """
+        envelope = OrderedDict(next=self.get_next_link(), previous=self.get_previous_link())
+        if self.count is not None:
+            envelope["count"] = self.count
+        envelope["results"] = results
+        return envelope
+
+    def get_paginated_response(self, data: Any) -> Response:
+        return Response(self.get_envelope(data))
+
+    def get_paginated_response_schema(self, schema: Dict) -> Dict:
+        properties = {
+            "next": {"type": "string", "nullable": True, "format": "uri"},
+            "previous": {"type": "string", "nullable": True, "format": "uri"},
+            "results": schema,
+        }
+        required = ["results"]
+        if self.include_count:
+            properties["count"] = {"type": "integer"}
+            required.append("count")
+        return {"type": "object", "required": required, "properties": properties}
+
+    def get_schema_operation_parameters(self, view) -> List[Dict]:
+        parameters = [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "The pagination cursor value.",
+                "schema": {"type": "string"},
+            }
+        ]
+        if self.page_size_query_param:
+            parameters.append(
+                {
+                    "name": self.page_size_query_param,
+                    "required": False,
+                    "in": "query",
+                    "description": "Number of results to return per page.",
+                    "schema": {"type": "integer"},
+                }
+            )
+        return parameters
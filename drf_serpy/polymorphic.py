@@ -0,0 +1,127 @@
+import copy
+from typing import Any, Dict, Iterable, List, Type, Union
+
+from drf_serpy.serializer import Serializer, _iter_instances
+
+
+class PolymorphicSerializer(Serializer):
+    """`PolymorphicSerializer` serializes each object with the serializer of
+    its type, e.g. for a feed mixing posts and comments.
+
+    ``serializers`` maps classes to serpy serializers. An object is serialized
+    by the serializer of the first class of its MRO found in the mapping, the
+    lookup is cached for each type. With ``discriminator`` set, the mapping
+    keys are the values of that attribute instead.
+
+    With ``many=True`` the objects of each serializer are serialized together
+    with its ``many=True`` path, so its batch fields run once for the whole
+    group, and the results are put back in the order of the objects.
+
+    Example:
+    ```py
+    class FeedSerializer(PolymorphicSerializer):
+        serializers = {Post: PostSerializer, Comment: CommentSerializer}
+
+    FeedSerializer([post, comment], many=True).data
+    # [{'title': ...}, {'comment': ...}]
+
+    class EventSerializer(PolymorphicSerializer):
+        discriminator = "kind"
+        serializers = {"signup": SignupSerializer, "order": OrderSerializer}
+    ```
+    """
+
+    #: The serializer (class or instance) of each class or discriminator value.
+    serializers: Dict[Any, Union[Type[Serializer], Serializer]] = {}
+    #: The attribute of the objects whose value selects the serializer.
+    discriminator = None
+    _prototypes = {}
+    _dispatch_cache = {}
+    _discriminator_getter = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # instances are copied for each call, see `_bind`
+        cls._prototypes = {
+            key: serializer() if isinstance(serializer, type) else serializer
+            for key, serializer in cls.serializers.items()
+        }
+        cls._dispatch_cache = {}
+        cls._discriminator_getter = (
+            cls.default_getter(cls.discriminator) if cls.discriminator else None
+        )
+
+    @property
+    def per_call(self) -> bool:
+        # bound to each call of a parent, so the sub serializers get its context
+        return self.loader is None
+
+    def sideload_field(self, serializer: Serializer, compiled_field: tuple, included: Dict):
+        # objects of mixed types are serialized in place
+        return compiled_field
+
+    def get_serializer(self, instance: Any) -> Serializer:
+        """Return the serializer prototype of ``instance``.
+
+        :raises TypeError: If no serializer is declared for the object.
+        """
+        if self._discriminator_getter is not None:
+            key = self._discriminator_getter(instance)
+            try:
+                return self._prototypes[key]
+            except KeyError:
+                raise TypeError(
+                    "No serializer for {0}={1!r} in {2}".format(
+                        self.discriminator, key, type(self).__name__
+                    )
+                )
+
+        instance_cls = type(instance)
+        serializer = self._dispatch_cache.get(instance_cls)
+        if serializer is None:
+            for cls in instance_cls.__mro__:
+                serializer = self._prototypes.get(cls)
+                if serializer is not None:
+                    break
+            else:
+                raise TypeError(
+                    "No serializer for {0} in {1}".format(
+                        instance_cls.__name__, type(self).__name__
+                    )
+                )
+            self._dispatch_cache[instance_cls] = serializer
+        return serializer
+
+    def _bind(self, prototype: Serializer, many: bool) -> Serializer:
+        bound = copy.copy(prototype)
+        bound.context = self.context
+        bound.many = many
+        bound.lazy = bound.sideload = False
+        if self.omit_none:
+            bound.omit_none = True
+        return bound
+
+    def to_value(self, instance: Any) -> Union[Dict, List]:
+        if not self.many:
+            return self._bind(self.get_serializer(instance), many=False).to_value(instance)
+        return self._serialize_many(instance, ())
+
+    def _serialize_many(self, instances: Iterable, fields: tuple) -> List[Dict]:
+        get_serializer = self.get_serializer
+        groups = {}
+        count = 0
+        for index, instance in enumerate(_iter_instances(instances, self.chunk_size)):
+            prototype = get_serializer(instance)
+            group = groups.get(id(prototype))
+            if group is None:
+                group = groups[id(prototype)] = (prototype, [], [])
+            group[1].append(index)
+            group[2].append(instance)
+            count = index + 1
+
+        results = [None] * count
+        for prototype, indexes, group_instances in groups.values():
+            data = self._bind(prototype, many=True).to_value(group_instances)
+            for index, value in zip(indexes, data):
+                results[index] = value
+        return results
@@ -0,0 +1,323 @@
+import logging
+import random
+import threading
+import warnings
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Type
+
+logger = logging.getLogger(__name__)
+
+#: The number of threads tracking a serialization call. `Serializer.to_value`
+#: only looks for the tracker of its thread when it isn't ``0``.
+tracking = 0
+_tracking_lock = threading.Lock()
+_local = threading.local()
+_policy = None
+# the number of `track` blocks open in any thread, so `sample` can skip the
+# thread locals while nothing is tracked
+_track_blocks = 0
+
+ACTIONS = ("warn", "log", "raise")
+
+
+class QueryBudgetExceeded(RuntimeError):
+    """Raised by a ``'raise'`` policy when a serializer ran more queries than
+    its budget or ran the same query once per object.
+
+    :param report: The `QueryReport` of the call.
+    """
+
+    def __init__(self, report: "QueryReport"):
+        super().__init__(str(report))
+        self.report = report
+
+
+class QueryBudgetWarning(UserWarning):
+    """Emitted by a ``'warn'`` policy, see `QueryBudgetExceeded`."""
+
+
+class QueryReport(object):
+    """The queries run by one `Serializer.data` call.
+
+    Each query is attributed to the innermost field whose getter or nested
+    serializer was running when it was executed, as a ``(serializer class,
+    field name)`` pair. Queries run by the serializer outside of its fields,
+    e.g. to fetch the objects of a QuerySet, have ``None`` as field name.
+    """
+
+    def __init__(self, serializer_cls: Type[Any], budget: Optional[int]):
+        self.serializer_cls = serializer_cls
+        #: The maximum number of queries of the call, ``None`` for no limit.
+        self.budget = budget
+        #: ``(serializer class, field name, sql)`` for each query, in order.
+        self.queries: List[Tuple[Type[Any], Optional[str], str]] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.queries)
+
+    @property
+    def exceeded(self) -> bool:
+        """Whether the call ran more queries than its budget."""
+        return self.budget is not None and self.count > self.budget
+
+    def by_field(self) -> Dict[Tuple[Type[Any], Optional[str]], int]:
+        """Return the number of queries of each ``(serializer class, field name)``."""
+        return dict(Counter((serializer_cls, name) for serializer_cls, name, _ in self.queries))
+
+    @property
+    def n_plus_one(self) -> List[Tuple[Type[Any], Optional[str], int]]:
+        """The fields that ran the same SQL more than once, typically once for
+        every serialized object, with the number of times they ran it.
+        """
+        repeated = {}
+        for query, count in Counter(self.queries).items():
+            if count > 1:
+                key = query[:2]
+                repeated[key] = max(repeated.get(key, 0), count)
+        return [(serializer_cls, name, count) for (serializer_cls, name), count in repeated.items()]
+
+    def __str__(self) -> str:
+        budget = "" if self.budget is None else " (budget {0})".format(self.budget)
+        lines = ["{0} ran {1} queries{2}".format(self.serializer_cls.__name__, self.count, budget)]
+        repeated = {(serializer_cls, name) for serializer_cls, name, _ in self.n_plus_one}
+        for (serializer_cls, name), count in self.by_field().items():
+            lines.append(
+                "  {0}{1}: {2}{3}".format(
+                    serializer_cls.__name__,
+                    "" if name is None else "." + name,
+                    count,
+                    "  N+1" if (serializer_cls, name) in repeated else "",
+                )
+            )
+        return "\n".join(lines)
+
+
+class _Tracker(object):
+    """Records the queries of a call for a `QueryReport`, installed with
+    ``connection.execute_wrapper``.
+    """
+
+    def __init__(self, report: QueryReport):
+        self.report = report
+        # the (serializer class, field name) running, innermost last
+        self.stack = [(report.serializer_cls, None)]
+        self._instrumented = {}
+
+    def __call__(self, execute: Callable, sql: str, params: Any, many: bool, context: Dict):
+        serializer_cls, name = self.stack[-1]
+        self.report.queries.append((serializer_cls, name, sql))
+        return execute(sql, params, many, context)
+
+    def _wrap(self, function: Callable, key: Tuple[Type[Any], str]) -> Callable:
+        stack = self.stack
+
+        def tracked(*args):
+            stack.append(key)
+            try:
+                return function(*args)
+            finally:
+                stack.pop()
+
+        return tracked
+
+    def _wrap_call(self, getter: Callable, key: Tuple[Type[Any], str]) -> Callable:
+        # the serializer calls the method returned by the getter itself, the
+        # wrapped method is only returned when it would be called
+        stack = self.stack
+
+        def get(instance):
+            method = getter(instance)
+            if method is None:
+                return None
+
+            def tracked():
+                stack.append(key)
+                try:
+                    return method()
+                finally:
+                    stack.pop()
+
+            return tracked
+
+        return get
+
+    def instrument(self, serializer_cls: Type[Any], fields: Tuple) -> Tuple:
+        entry = self._instrumented.get(id(fields))
+        if entry is not None and entry[0] is fields:
+            return entry[1]
+        instrumented = []
+        for name, getter, to_value, call, required, pass_self in fields:
+            key = (serializer_cls, name)
+            getter = self._wrap(getter, key)
+            if call and not pass_self:
+                getter = self._wrap_call(getter, key)
+            if to_value is not None:
+                # nested serializers query their related managers in `to_value`,
+                # the full one tracks their own fields as well
+                to_value = self._wrap(getattr(to_value, "full", to_value), key)
+            instrumented.append((name, getter, to_value, call, required, pass_self))
+        instrumented = tuple(instrumented)
+        # keep `fields` alive so its id isn't reused by another tuple
+        self._instrumented[id(fields)] = (fields, instrumented)
+        return instrumented
+
+
+def instrument(serializer: Any, fields: Tuple) -> Tuple:
+    """Return ``fields`` with their getters attributing queries to them, if
+    the current thread is tracking a serialization call.
+    """
+    tracker = getattr(_local, "tracker", None)
+    if tracker is None:
+        return fields
+    return tracker.instrument(type(serializer), fields)
+
+
+class _Policy(object):
+    def __init__(
+        self,
+        action: str,
+        budget: Optional[int],
+        default_budget: Optional[int],
+        n_plus_one: bool,
+        sample_rate: float = 1.0,
+        reports: Optional[List[QueryReport]] = None,
+    ):
+        if action not in ACTIONS:
+            raise ValueError("action must be one of {0}".format(", ".join(ACTIONS)))
+        if not 0 <= sample_rate <= 1:
+            raise ValueError("sample_rate must be between 0 and 1")
+        self.action = action
+        self.budget = budget
+        self.default_budget = default_budget
+        self.n_plus_one = n_plus_one
+        self.sample_rate = sample_rate
+        self.reports = reports
+
+    def run(self, serializer_cls: Type[Any], serialize: Callable[[], Any]) -> Any:
+        """Call ``serialize`` while tracking its queries and enforce the
+        budget of ``serializer_cls`` on them.
+        """
+        from django.db import connections
+
+        global tracking
+        budget = self.budget
+        if budget is None:
+            budget = serializer_cls.query_budget
+            if budget is None:
+                budget = self.default_budget
+        report = QueryReport(serializer_cls, budget)
+        tracker = _Tracker(report)
+        with _tracking_lock:
+            tracking += 1
+        _local.tracker = tracker
+        try:
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(connections[alias].execute_wrapper(tracker))
+                result = serialize()
+        finally:
+            _local.tracker = None
+            with _tracking_lock:
+                tracking -= 1
+        self.check(report)
+        return result
+
+    def check(self, report: QueryReport):
+        if self.reports is not None:
+            self.reports.append(report)
+        if not report.exceeded and not (self.n_plus_one and report.n_plus_one):
+            return
+        if self.action == "raise":
+            raise QueryBudgetExceeded(report)
+        if self.action == "warn":
+            warnings.warn(str(report), QueryBudgetWarning, stacklevel=4)
+        else:
+            logger.warning("%s", report)
+
+
+def configure(
+    action: Optional[str] = None,
+    budget: Optional[int] = None,
+    n_plus_one: bool = True,
+    sample_rate: float = 1.0,
+):
+    """Track the queries of sampled `Serializer.data` calls, or stop tracking
+    them if ``action`` is ``None``.
+
+    A call is reported when it runs more queries than the
+    `Serializer.query_budget` of its serializer, or than ``budget`` for
+    serializers without one, or when ``n_plus_one`` is set and a field runs
+    the same query more than once.
+
+    Example:
+    ```py
+    # settings.py, or an AppConfig.ready()
+    drf_serpy.queries.configure("log", budget=20, sample_rate=0.01)
+    ```
+    :param str action: ``'warn'`` to emit a `QueryBudgetWarning`, ``'log'``
+        to log a warning on the ``drf_serpy.queries`` logger or ``'raise'``
+        to raise `QueryBudgetExceeded` once the call is done.
+    :param int budget: The budget of serializers without a ``query_budget``.
+    :param bool n_plus_one: Whether a query repeated by a field is reported.
+    :param float sample_rate: The fraction of calls that are tracked, between
+        ``0`` and ``1``. Calls that aren't sampled don't track their queries,
+        they only look up the state of their thread and draw a random number.
+    """
+    global _policy
+    if action is None:
+        _policy = None
+    else:
+        _policy = _Policy(action, None, budget, n_plus_one, sample_rate)
+
+
+@contextmanager
+def track(
+    budget: Optional[int] = None, action: str = "raise", n_plus_one: bool = True
+) -> Iterator[List[QueryReport]]:
+    """Track the queries of every `Serializer.data` call of the current
+    thread inside the block, e.g. in a test. The reports of the calls are
+    appended to the yielded list.
+
+    Example:
+    ```py
+    with drf_serpy.queries.track(budget=3) as reports:
+        response = self.client.get("/api/posts/")
+    print(reports[0])
+    # PostSerializer ran 2 queries (budget 3)
+    #   PostSerializer: 1
+    #   PostSerializer.tags: 1
+    ```
+    :param int budget: The budget of every call, instead of their
+        `Serializer.query_budget`.
+    :param str action: See `configure`, raises by default.
+    :param bool n_plus_one: Whether a query repeated by a field is reported.
+    """
+    global _track_blocks
+    reports = []
+    previous = getattr(_local, "policy", None)
+    _local.policy = _Policy(action, budget, None, n_plus_one, reports=reports)
+    with _tracking_lock:
+        _track_blocks += 1
+    try:
+        yield reports
+    finally:
+        _local.policy = previous
+        with _tracking_lock:
+            _track_blocks -= 1
+
+
+def sample() -> Optional[_Policy]:
+    """Return the policy tracking the current call, if it should be tracked."""
+    if _policy is None and not _track_blocks:
+        return None
+    if getattr(_local, "tracker", None) is not None:
+        # called while serializing, the queries go to the enclosing call
+        return None
+    policy = getattr(_local, "policy", None)
+    if policy is None:
+        policy = _policy
+        if policy is None or (policy.sample_rate < 1 and random.random() >= policy.sample_rate):
+            return None
+    return policy
@@ -0,0 +1,78 @@
+from typing import Any, Dict
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from drf_serpy import metrics
+from drf_serpy.encoders import dumps
+from drf_serpy.serializer import Serializer
+
+# U+2028 and U+2029 are escaped so the output stays a strict javascript subset
+_LINE_SEPARATOR = "\u2028".encode("utf-8")
+_PARAGRAPH_SEPARATOR = "\u2029".encode("utf-8")
+
+
+class SerpyJSONRenderer(JSONRenderer):
+    """A DRF `JSONRenderer` that encodes serpy output with `drf_serpy.encoders.dumps`.
+
+    The data is encoded straight to UTF-8 ``bytes`` with ``orjson`` when it is
+    installed, `drf_serpy.encoders.JSONFragment` values are written verbatim,
+    and a serpy `Serializer` passed as the response data is serialized by the
+    renderer itself.
+
+    Example:
+    ```py
+    class PostViewSet(ModelViewSet):
+        renderer_classes = (SerpyJSONRenderer, BrowsableAPIRenderer)
+    ```
+    """
+
+    def render(
+        self, data: Any, accepted_media_type: str = None, renderer_context: Dict = None
+    ) -> bytes:
+        if data is None:
+            return b""
+        renderer_context = renderer_context or {}
+        serializer = getattr(renderer_context.get("response"), "serializer", None)
+        if isinstance(data, Serializer):
+            serializer, data = data, data.data
+
+        indent = self.get_indent(accepted_media_type, renderer_context)
+        ret = dumps(data, default=self.encoder_class().default, indent=indent)
+
+        if serializer is not None:
+            sink = metrics.sample()
+            if sink is not None:
+                sink.record_size(type(serializer), len(ret))
+
+        if _LINE_SEPARATOR in ret:
+            ret = ret.replace(_LINE_SEPARATOR, b"\\u2028")
+        if _PARAGRAPH_SEPARATOR in ret:
+            ret = ret.replace(_PARAGRAPH_SEPARATOR, b"\\u2029")
+        return ret
+
+
+class SerpyResponse(Response):
+    """A `Response` built from a serpy `Serializer`.
+
+    The serializer is kept on the response as ``serializer`` so renderers
+    can recognize it, while ``data`` holds its serialized data for any other
+    renderer in the content negotiation.
+
+    Example:
+    ```py
+    def list(self, request, *args, **kwargs):
+        return SerpyResponse(PostSerializer(self.get_queryset(), many=True))
+    ```
+
+    :param serializer: A serpy `Serializer` instance, or already serialized data.
+    """
+
+    def __init__(self, serializer: Any = None, *args, **kwargs):
+        if isinstance(serializer, Serializer):
+            self.serializer = serializer
+            data = serializer.data
+        else:
+            self.serializer = None
+            data = serializer
+        super().__init__(data, *args, **kwargs)
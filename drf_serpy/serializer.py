@@ -1,21 +1,53 @@
+import copy
+import importlib.util
 import operator
+import threading
+import time
+import warnings
+import weakref
 from collections.abc import Iterable
-from typing import Any, Dict, List, Tuple, Type, Union
+from types import MappingProxyType
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple, Type, Union
 
 from drf_yasg import openapi
 
-from drf_serpy.fields import Field, MethodField
+from drf_serpy import metrics, queries
+from drf_serpy.fields import (
+    SCHEMA_MAPPER,
+    AnnotatedField,
+    BatchMethodField,
+    Field,
+    MethodField,
+    RecursiveField,
+    RelatedIdField,
+    _get_setting,
+    _resolve_related_manager,
+)
+from drf_serpy.lazy import LazyList
 
-SCHEMA_MAPPER = {
-    str: openapi.TYPE_STRING,
-    int: openapi.TYPE_INTEGER,
-    float: openapi.TYPE_NUMBER,
-    bool: openapi.TYPE_BOOLEAN,
-}
+# Django >= 4.1 prefetches related objects for each chunk of QuerySet.iterator(),
+# older versions silently drop prefetch_related() lookups when iterating in chunks.
+PREFETCH_AWARE_ITERATOR = False
+if importlib.util.find_spec("django"):  # noqa
+    import django
+
+    PREFETCH_AWARE_ITERATOR = django.VERSION >= (4, 1)
 
 
 class SerializerBase(Field):
-    _field_map = {}
+    _field_map = MappingProxyType({})
+    _per_call_fields = ()
+    _batch_fields = ()
+    _nested_fields = ()
+    _annotations = MappingProxyType({})
+    _recursive_fields = ()
+    _takes_serializer = False
+    expandable = False
+
+
+def _is_collapsed(field: Field) -> bool:
+    # expandable nested serializers render as primary keys unless expanded
+    return isinstance(field, SerializerBase) and field.expandable
 
 
 def _compile_field_to_tuple(
@@ -23,11 +55,14 @@ def _compile_field_to_tuple(
 ) -> Tuple:
     getter = field.as_getter(name, serializer_cls)
     if getter is None:
-        getter = serializer_cls.default_getter(field.attr or name)
+        attr = field.attr or name
+        getter = _column_getter(serializer_cls, attr) or serializer_cls.default_getter(attr)
 
     # Only set a to_value function if it has been overridden for performance.
     to_value = None
-    if field._is_to_value_overridden():
+    if isinstance(field, Serializer):
+        to_value = field._compile_to_value()
+    elif field._is_to_value_overridden():
         to_value = field.to_value
 
     # Set the field name to a supplied label; defaults to the attribute name.
@@ -36,6 +71,204 @@ def _compile_field_to_tuple(
     return (name, getter, to_value, field.call, field.required, field.getter_takes_serializer)
 
 
+def _column_getter(serializer_cls: Type["Serializer"], attr: str) -> Optional[Callable]:
+    """Return a getter reading the column ``attr`` of the Django ``model`` of
+    the serializer from the ``__dict__`` of the objects, or ``None``.
+
+    Only columns whose descriptor runs Python code on every access, like the
+    ``author_id`` column of a foreign key, get one: ``attrgetter`` already
+    reads the other columns from the ``__dict__`` without calling their
+    descriptor. Deferred columns aren't in the ``__dict__`` and are read
+    through the descriptor, which loads them.
+    """
+    model = serializer_cls.model
+    if model is None or serializer_cls.default_getter is not operator.attrgetter:
+        return None
+    from django.db.models.query_utils import DeferredAttribute
+
+    descriptor = getattr(model, attr, None)
+    if not (
+        isinstance(descriptor, DeferredAttribute)
+        and type(descriptor).__get__ is DeferredAttribute.__get__
+        and hasattr(type(descriptor), "__set__")
+    ):
+        return None
+    attname = descriptor.field.attname
+    descriptor_getter = operator.attrgetter(attr)
+
+    def getter(instance: Any) -> Any:
+        try:
+            return instance.__dict__[attname]
+        except KeyError:
+            return descriptor_getter(instance)
+
+    return getter
+
+
+def _get_field_names(model: Any) -> Dict[str, str]:
+    # the name of the model field of each concrete field name and attname, e.g. author_id
+    field_names = {}
+    for model_field in model._meta.concrete_fields:
+        field_names[model_field.name] = field_names[model_field.attname] = model_field.name
+    return field_names
+
+
+def _compile_columns(serializer_cls: Type["Serializer"]) -> FrozenSet[str]:
+    """Return the names of the fields of the Django ``model`` of the
+    serializer read by its fields with the default getter.
+    """
+    field_names = _get_field_names(serializer_cls.model)
+    return frozenset(
+        field_names[field.attr or name]
+        for name, field in serializer_cls._field_map.items()
+        if (field.attr or name) in field_names
+        and type(field).as_getter is Field.as_getter
+        and field.loader is None
+        and not isinstance(field, SerializerBase)
+    )
+
+
+def _collapsed_field(field: "Serializer") -> RelatedIdField:
+    # the field rendering a collapsed expandable serializer
+    return RelatedIdField(
+        many=field.many,
+        pk_attr=field.pk_attr,
+        attr=field.attr,
+        label=field.label,
+        required=field.required,
+        key=field.key,
+    )
+
+
+def _collapsed_field_to_tuple(
+    field: "Serializer", name: str, serializer_cls: Type["Serializer"]
+) -> Tuple:
+    return _compile_field_to_tuple(_collapsed_field(field), name, serializer_cls)
+
+
+def _none(instance: Any):
+    return None
+
+
+def _parse_expand(expand: Union[str, Iterable[str]]) -> Dict[str, Any]:
+    # "author,tags.user" -> {"author": {}, "tags": {"user": {}}}
+    if isinstance(expand, str):
+        expand = expand.split(",")
+    tree = {}
+    for path in expand:
+        node = tree
+        for name in path.strip().split("."):
+            if name:
+                node = node.setdefault(name, {})
+    return tree
+
+
+def _expand_key(expand: Dict[str, Any]) -> frozenset:
+    return frozenset((name, _expand_key(sub_expand)) for name, sub_expand in expand.items())
+
+
+def _iter_instances(instances: Any, chunk_size: int) -> Iterable:
+    """Pick the iteration strategy for the ``instances`` of a ``many=True`` field.
+
+    Django QuerySets are streamed in chunks of ``chunk_size`` with
+    ``QuerySet.iterator`` so the memory of a chunk is released once it is
+    serialized, unless that would throw away the results of
+    ``prefetch_related``. Related managers are resolved with ``.all()`` so
+    the prefetched objects are used instead of a query per row.
+    """
+    iterator = getattr(instances, "iterator", None)
+    if iterator is None:
+        return instances
+    instances = _resolve_related_manager(instances)
+    if not hasattr(instances, "_result_cache"):
+        # neither a QuerySet nor a related manager
+        return iterator()
+    if getattr(instances, "_result_cache", None) is not None:
+        # already evaluated (or prefetched), iterator() would query again
+        return instances
+    if getattr(instances, "_prefetch_related_lookups", None) and not PREFETCH_AWARE_ITERATOR:
+        return instances
+    return instances.iterator(chunk_size=chunk_size)
+
+
+_compile_lock = threading.RLock()
+# serializer classes whose compilation has been deferred until their first use
+_pending_compilation = weakref.WeakSet()
+_compile_stats = {"compiled": 0, "seconds": 0.0}
+
+
+class _LazyCompiledFields(object):
+    """Compiles the fields of a ``lazy_compile`` serializer on first access and
+    replaces itself with the result, so later accesses are plain attribute reads.
+    """
+
+    def __init__(self, serializer_cls: Type["Serializer"]):
+        self.serializer_cls = serializer_cls
+
+    def __get__(self, instance: Any, owner: Type["Serializer"]) -> Tuple:
+        return self.compile()
+
+    def compile(self) -> Tuple:
+        serializer_cls = self.serializer_cls
+        with _compile_lock:
+            compiled = serializer_cls.__dict__["_compiled_fields"]
+            if compiled is self:
+                meta = type(serializer_cls)
+                compiled = meta._timed_compile(serializer_cls._field_map, serializer_cls)
+                serializer_cls._compiled_fields = compiled
+                _pending_compilation.discard(serializer_cls)
+        return compiled
+
+
+def compile_stats() -> Dict[str, Union[int, float]]:
+    """Return how many serializer classes have been compiled, how long it
+    took in seconds, and how many ``lazy_compile`` classes are still pending.
+    """
+    return dict(_compile_stats, pending=len(_pending_compilation))
+
+
+def warmup() -> Dict[str, Union[int, float]]:
+    """Compile every ``lazy_compile`` serializer class that hasn't been used yet.
+
+    Call it once the application is loaded, e.g. from a readiness probe, so
+    the first requests don't pay for the compilation. Returns `compile_stats`.
+    """
+    for serializer_cls in list(_pending_compilation):
+        compiled = serializer_cls.__dict__["_compiled_fields"]
+        if isinstance(compiled, _LazyCompiledFields):
+            compiled.compile()
+    return compile_stats()
+
+
+class _Included(dict):
+    """The sideloaded objects of a call, by serializer class and primary key,
+    with the objects waiting to be serialized.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._pending: Dict[Any, Tuple[Callable[[List], None], List]] = {}
+
+    def pending(self, key: Any, serialize: Callable[[List], None]) -> List:
+        """Return the list of the objects waiting for ``key``, serialized by
+        the ``serialize`` function registered first for it.
+        """
+        return self._pending.setdefault(key, (serialize, []))[1]
+
+    def flush(self):
+        # serialized objects can add new ones, until none is left
+        while True:
+            batches = [
+                (serialize, pending) for serialize, pending in self._pending.values() if pending
+            ]
+            if not batches:
+                return
+            for serialize, pending in batches:
+                batch = pending[:]
+                del pending[:]
+                serialize(batch)
+
+
 class SerializerMeta(type):
     @staticmethod
     def _get_fields(direct_fields: Dict, serializer_cls: Type["Serializer"]):
@@ -50,10 +283,23 @@ class SerializerMeta(type):
     @staticmethod
     def _compile_fields(field_map: Dict, serializer_cls: Type["Serializer"]):
         return [
-            _compile_field_to_tuple(field, name, serializer_cls)
+            (
+                _collapsed_field_to_tuple(field, name, serializer_cls)
+                if _is_collapsed(field)
+                else _compile_field_to_tuple(field, name, serializer_cls)
+            )
             for name, field in field_map.items()
         ]
 
+    @staticmethod
+    def _timed_compile(field_map: Dict, serializer_cls: Type["Serializer"]) -> Tuple:
+        start = time.perf_counter()
+        compiled_fields = tuple(type(serializer_cls)._compile_fields(field_map, serializer_cls))
+        with _compile_lock:
+            _compile_stats["compiled"] += 1
+            _compile_stats["seconds"] += time.perf_counter() - start
+        return compiled_fields
+
     def __new__(cls, name: str, bases: Tuple, attrs: Dict) -> Type["SerializerMeta"]:
         # Fields declared directly on the class.
         direct_fields = {}
@@ -67,11 +313,52 @@ class SerializerMeta(type):
 
         real_cls = super(SerializerMeta, cls).__new__(cls, name, bases, attrs)
 
+        # The field map and the compiled fields are shared by every call on
+        # every thread, so they are never mutated once the class is created.
         field_map = cls._get_fields(direct_fields, real_cls)
-        compiled_fields = cls._compile_fields(field_map, real_cls)
+        real_cls._field_map = MappingProxyType(field_map)
 
-        real_cls._field_map = field_map
-        real_cls._compiled_fields = tuple(compiled_fields)
+        lazy_compile = real_cls.lazy_compile
+        if lazy_compile is None:
+            lazy_compile = _get_setting("SERPY_LAZY_COMPILE", False)
+        if lazy_compile:
+            real_cls._compiled_fields = _LazyCompiledFields(real_cls)
+            _pending_compilation.add(real_cls)
+        else:
+            real_cls._compiled_fields = cls._timed_compile(field_map, real_cls)
+
+        real_cls._per_call_fields = tuple(
+            (index, field)
+            for index, field in enumerate(field_map.values())
+            if field.per_call and not _is_collapsed(field)
+        )
+        real_cls._batch_fields = tuple(
+            (index, field)
+            for index, field in enumerate(field_map.values())
+            if field.batch and not _is_collapsed(field)
+        )
+        real_cls._nested_fields = tuple(
+            (index, field)
+            for index, field in enumerate(field_map.values())
+            if isinstance(field, SerializerBase) and not _is_collapsed(field)
+        )
+        real_cls._recursive_fields = tuple(
+            (index, field)
+            for index, field in enumerate(field_map.values())
+            if isinstance(field, RecursiveField)
+        )
+        real_cls._annotations = MappingProxyType(
+            {
+                field.attr or name: field.expression
+                for name, field in field_map.items()
+                if isinstance(field, AnnotatedField)
+            }
+        )
+        # compiled, per-call, batch and nested fields for each set of expanded fields
+        real_cls._expand_plans = {}
+        real_cls._takes_serializer = any(
+            field.getter_takes_serializer for field in field_map.values()
+        )
         return real_cls
 
 
@@ -99,10 +386,66 @@ class Serializer(SerializerBase, metaclass=SerializerMeta):
     :param dict context: Currently unused parameter for compatability with Django
         REST Framework serializers.
         you can manually pass the context in and use it on the functions like as a runtime attribute
+    :param int chunk_size: Number of rows fetched at a time when a Django
+        QuerySet is serialized with ``many=True``. Defaults to
+        `Serializer.chunk_size`.
+    :param bool omit_none: Leave fields whose value is ``None`` out of the
+        output instead of serializing them as ``null``, in the nested
+        serializers as well. Defaults to `Serializer.omit_none`.
+    :param bool lazy: With ``many=True``, return a `drf_serpy.lazy.LazyList`
+        that serializes each object when it is accessed instead of a list.
+        Defaults to `Serializer.lazy`.
+    :param bool sideload: Replace the objects of nested serializers with their
+        primary key (`Serializer.pk_attr`) and serialize each distinct object
+        once in an ``included`` map, grouped by `Serializer.resource_type`:
+        ``{"data": ..., "included": {"UserSerializer": {1: {...}}}}``.
+        Defaults to `Serializer.sideload`.
+    :param expand: The ``expandable`` nested serializers to serialize in
+        full, as a list of field names or a comma separated string, e.g.
+        ``"author,comments.user"``. Unknown names are ignored.
+    :param bool expandable: When used as a nested field, serialize only the
+        primary key of the related object, unless the field is expanded by
+        the parent. The key is read like a `RelatedIdField` would, without
+        loading the related object. With ``many=True`` the list of the
+        `Serializer.pk_attr` of the related objects is serialized.
     """
 
     #: The default getter used if :meth:`Field.as_getter` returns None.
     default_getter = operator.attrgetter
+    #: Whether to compile the fields of the class on first use instead of
+    #: when the class is defined, see `warmup`. ``None`` uses the
+    #: ``SERPY_LAZY_COMPILE`` setting, which defaults to ``False``.
+    lazy_compile = None
+    #: Number of rows fetched at a time when iterating over a QuerySet.
+    chunk_size = 2000
+    #: Whether fields whose value is ``None`` are left out of the output.
+    #: Nested serializers are skipped entirely when their object is missing.
+    omit_none = False
+    #: Whether ``many=True`` returns a `drf_serpy.lazy.LazyList`.
+    lazy = False
+    #: Whether nested objects are sideloaded, see the ``sideload`` argument.
+    sideload = False
+    #: The name of the ``included`` group of the objects of this serializer
+    #: when they are sideloaded. Defaults to the name of the class.
+    resource_type = None
+    #: The attribute holding the primary key of the objects, used when an
+    #: ``expandable`` nested serializer with ``many=True`` is collapsed.
+    pk_attr = "pk"
+    #: The Django model of the serialized objects, if any. Fields like
+    #: `RelatedIdField` look up the columns of the model when compiled.
+    model = None
+    #: What to do when a ``many=True`` call gets a QuerySet whose ``.only()``
+    #: or ``.defer()`` leaves out a column read by the fields, which would be
+    #: queried for every object: ``'raise'`` a ``RuntimeError`` or ``'warn'``.
+    #: Only checked with a `Serializer.model`.
+    on_deferred = "raise"
+    #: The maximum number of queries of a ``.data`` call when they are
+    #: tracked, see `drf_serpy.queries`. ``None`` for no limit.
+    query_budget = None
+    # fields prepared by the parent serializer for the current call, see `Serializer.prepare`
+    _prepared_fields = None
+    # set on the copies serializing sideloaded objects, see `Serializer.prepare_batch`
+    _sideloading = False
 
     def __init__(
         self,
@@ -110,6 +453,12 @@ class Serializer(SerializerBase, metaclass=SerializerMeta):
         many: bool = False,
         data: dict = None,
         context: dict = None,
+        chunk_size: int = None,
+        omit_none: bool = None,
+        lazy: bool = None,
+        sideload: bool = None,
+        expand: Union[str, Iterable[str]] = None,
+        expandable: bool = False,
         **kwargs,
     ):
         if data is not None:
@@ -120,6 +469,84 @@ class Serializer(SerializerBase, metaclass=SerializerMeta):
         self.many = many
         self._data = None
         self.context = context
+        self.chunk_size = chunk_size or self.chunk_size
+        if omit_none is not None:
+            self.omit_none = omit_none
+        if lazy is not None:
+            self.lazy = lazy
+        if sideload is not None:
+            self.sideload = sideload
+        self.expandable = expandable
+        if self._batch_fields:
+            # the batch fields of a nested serializer are resolved for all the
+            # objects of the level, see `Serializer.prepare_batch`
+            self.batch = True
+        if expand:
+            self._set_plan(self._get_plan(_parse_expand(expand)))
+
+    def _set_plan(self, plan: Tuple):
+        # shadow the fields compiled on the class with the ones of an expand set
+        (
+            self._compiled_fields,
+            self._per_call_fields,
+            self._batch_fields,
+            self._nested_fields,
+        ) = plan
+        self.batch = self.loader is not None or bool(self._batch_fields)
+
+    @classmethod
+    def _normalize_expand(cls, expand: Dict[str, Any]) -> Dict[str, Any]:
+        # keep the names of nested serializers only, at every level
+        normalized = {}
+        for name, sub_expand in expand.items():
+            field = cls._field_map.get(name)
+            if isinstance(field, SerializerBase):
+                normalized[name] = type(field)._normalize_expand(sub_expand) if sub_expand else {}
+        return normalized
+
+    @classmethod
+    def _get_plan(cls, expand: Dict[str, Any]) -> Tuple:
+        """Return the compiled, per-call, batch and nested fields with the
+        ``expandable`` nested serializers in the ``expand`` tree expanded.
+
+        Plans are cached on the class for each distinct set of expanded
+        fields, unknown names are dropped from every level of the tree first
+        so the cache stays bounded.
+        """
+        expand = cls._normalize_expand(expand)
+        if not expand:
+            return cls._compiled_fields, cls._per_call_fields, cls._batch_fields, cls._nested_fields
+        key = _expand_key(expand)
+        plan = cls._expand_plans.get(key)
+        if plan is not None:
+            return plan
+
+        compiled_fields = list(cls._compiled_fields)
+        per_call_fields = []
+        batch_fields = []
+        nested_fields = []
+        for index, (name, field) in enumerate(cls._field_map.items()):
+            if name in expand:
+                sub_plan = type(field)._get_plan(expand[name])
+                if sub_plan[0] is not type(field)._compiled_fields:
+                    field = copy.copy(field)
+                    field._set_plan(sub_plan)
+                compiled_fields[index] = _compile_field_to_tuple(field, name, cls)
+            elif _is_collapsed(field):
+                continue
+            if field.per_call:
+                per_call_fields.append((index, field))
+            if field.batch:
+                batch_fields.append((index, field))
+            if isinstance(field, SerializerBase):
+                nested_fields.append((index, field))
+        plan = (
+            tuple(compiled_fields),
+            tuple(per_call_fields),
+            tuple(batch_fields),
+            tuple(nested_fields),
+        )
+        return cls._expand_plans.setdefault(key, plan)
 
     def _serialize(self, instance: Type[Any], fields: Tuple):
         v = {}
@@ -143,24 +570,459 @@ class Serializer(SerializerBase, metaclass=SerializerMeta):
 
         return v
 
+    def _serialize_sparse(self, instance: Type[Any], fields: Tuple):
+        # `_serialize` for `omit_none`, a None value skips the rest of the field pipeline
+        v = {}
+        for name, getter, to_value, call, required, pass_self in fields:
+            if pass_self:
+                result = getter(self, instance)
+            else:
+                try:
+                    result = getter(instance)
+                except (KeyError, AttributeError):
+                    if required:
+                        raise
+                    else:
+                        continue
+                if result is None:
+                    continue
+                if call:
+                    result = result()
+                if to_value:
+                    result = to_value(result)
+            if result is not None:
+                v[name] = result
+
+        return v
+
+    @property
+    def per_call(self) -> bool:
+        # A nested serializer has to be prepared if any of its fields are, and
+        # if its methods are called with it, so they get a copy bound to the
+        # current call instead of the instance shared by every call and thread.
+        # Nested serializers with a loader are prepared in `Serializer.load`.
+        return (bool(self._per_call_fields) or self._takes_serializer) and self.loader is None
+
+    def prepare(self, serializer: "Serializer", compiled_field: Tuple) -> Tuple:
+        """Prepare the ``per_call`` fields of a nested serializer once for
+        the whole call of its parent ``serializer``, whose context it shares.
+        Its ``omit_none`` applies to the nested serializer as well.
+        """
+        if (
+            not self._per_call_fields
+            and serializer.context is self.context
+            and (self.omit_none or not serializer.omit_none)
+        ):
+            # methods would get the same context from a copy
+            return compiled_field
+        name, getter, _, call, required, pass_self = compiled_field
+        bound = self._bind_to(serializer)
+        if bound._per_call_fields or (bound.omit_none and bound._nested_fields):
+            bound._prepared_fields = bound._prepare_fields(self._compiled_fields)
+            to_value = bound.to_value
+        else:
+            to_value = bound._compile_to_value()
+        return (name, getter, to_value, call, required, pass_self)
+
+    def load(self, serializer: "Serializer", keys: List[Any]) -> Dict[Any, Any]:
+        """Load the objects of a nested serializer with a ``loader`` and
+        serialize all of them at once, so the loaders of its own fields are
+        called once for the whole level as well.
+        """
+        loaded = self.loader(keys) if keys else {}
+        bound = self._bind_to(serializer)
+        fields = bound._compiled_fields
+        if bound._per_call_fields or bound.omit_none:
+            fields = bound._prepare_fields(fields)
+        return dict(zip(loaded.keys(), bound._serialize_many(loaded.values(), fields)))
+
+    def prepare_batch(
+        self, serializer: "Serializer", compiled_field: Tuple, instances: List[Any]
+    ) -> Tuple:
+        """Resolve the batch fields of a nested serializer once for the
+        related objects of all the ``instances`` of its parent, e.g. for every
+        comment of a page of posts, instead of once per parent object.
+
+        Nested serializers with a ``loader`` load their objects instead, see
+        `Serializer.load`.
+        """
+        if self.loader is not None:
+            return super().prepare_batch(serializer, compiled_field, instances)
+        if serializer._sideloading:
+            # the field adds its objects to the included ones, which resolve
+            # their batch fields themselves, see `Serializer.sideload_field`
+            return compiled_field
+        name, getter, _, call, required, pass_self = compiled_field
+        # the related objects of each parent object, by id since objects
+        # aren't always hashable
+        values = {}
+        related = []
+        for instance in instances:
+            try:
+                value = getter(instance)
+            except (KeyError, AttributeError):
+                if required:
+                    raise
+                continue
+            if value is not None:
+                if call:
+                    value = value()
+                if self.many:
+                    value = list(_iter_instances(value, self.chunk_size))
+                    related.extend(value)
+                else:
+                    related.append(value)
+            values[id(instance)] = value
+
+        bound = self._bind_to(serializer)
+        fields = bound._compiled_fields
+        if bound._per_call_fields or bound.omit_none:
+            fields = bound._prepare_fields(fields)
+        if queries.tracking:
+            fields = queries.instrument(bound, fields)
+        fields = bound._prepare_batch_fields(fields, related)
+        serialize = bound._serialize_sparse if bound.omit_none else bound._serialize
+        if self.many:
+
+            def to_value(value: List[Any]) -> List[Dict]:
+                return [serialize(o, fields) for o in value]
+
+        else:
+
+            def to_value(value: Any) -> Dict:
+                return serialize(value, fields)
+
+        # a missing id raises KeyError, like the getter of a missing attribute
+        return (name, lambda obj: values[id(obj)], to_value, False, required, pass_self)
+
+    def sideload_field(
+        self, serializer: "Serializer", compiled_field: Tuple, included: "_Included"
+    ) -> Tuple:
+        """Return the compiled field of a nested serializer that adds its
+        objects to ``included`` and serializes their primary key instead.
+
+        The objects are serialized when ``included`` is flushed, all of the
+        objects of a serializer class added since the previous flush at once,
+        so its batch fields are resolved once for all of them.
+        """
+        if self.loader is not None:
+            # loaded objects are serialized all at once by `Serializer.load`
+            return compiled_field
+        name, getter, _, call, required, pass_self = compiled_field
+        bound = self._bind_to(serializer)
+        bound._sideloading = True
+        fields = bound._compiled_fields
+        if bound._per_call_fields or bound.omit_none:
+            fields = bound._prepare_fields(fields)
+        fields = bound._prepare_sideload(fields, included)
+        serialize = bound._serialize_sparse if bound.omit_none else bound._serialize
+        objects = included.setdefault(type(self), {})
+        pk_getter = type(self).default_getter(self.pk_attr)
+
+        def serialize_batch(batch: List[Tuple[Any, Any]]):
+            object_fields = fields
+            if bound._batch_fields:
+                object_fields = bound._prepare_batch_fields(fields, [o for _, o in batch])
+            for pk, instance in batch:
+                objects[pk] = serialize(instance, object_fields)
+
+        # the fields of a class share their objects unless serialized differently
+        key = (type(self), id(self._compiled_fields), bound.omit_none)
+        pending = included.pending(key, serialize_batch)
+
+        def reference(instance: Any) -> Any:
+            pk = pk_getter(instance)
+            if pk not in objects:
+                # set first, so the object is added once and a cycle back to it stops here
+                objects[pk] = None
+                pending.append((pk, instance))
+            return pk
+
+        if not self.many:
+            return (name, getter, reference, call, required, pass_self)
+
+        def references(instances: Iterable) -> List[Any]:
+            return [reference(o) for o in _iter_instances(instances, self.chunk_size)]
+
+        return (name, getter, references, call, required, pass_self)
+
+    def _prepare_sideload(self, fields: Tuple, included: "_Included") -> Tuple:
+        fields = list(fields)
+        for index, field in self._nested_fields:
+            fields[index] = field.sideload_field(self, fields[index], included)
+        return tuple(fields)
+
+    def _serialize_sideloaded(self, instance: Any, fields: Tuple) -> Dict:
+        included = _Included()
+        bound = copy.copy(self)
+        # rows of a lazy result would add to `included` after it is returned
+        bound.sideload = bound.lazy = False
+        bound._sideloading = True
+        bound._prepared_fields = self._prepare_sideload(fields, included)
+        data = bound.to_value(instance)
+        included.flush()
+        groups = {}
+        for serializer_cls, objects in included.items():
+            groups.setdefault(serializer_cls.resource_type or serializer_cls.__name__, {}).update(
+                objects
+            )
+        return {"data": data, "included": groups}
+
+    def _prepare_fields(self, fields: Tuple) -> Tuple:
+        per_call_fields = self._per_call_fields
+        if self.omit_none and self._nested_fields:
+            # nested serializers omit None values as well, see `Serializer.prepare`
+            per_call_fields = dict(per_call_fields)
+            per_call_fields.update(self._nested_fields)
+            per_call_fields = per_call_fields.items()
+        prepared = None
+        for index, field in per_call_fields:
+            compiled_field = field.prepare(self, fields[index])
+            if compiled_field is not fields[index]:
+                # copied once, and only if a field needs it
+                if prepared is None:
+                    prepared = list(fields)
+                prepared[index] = compiled_field
+        return fields if prepared is None else tuple(prepared)
+
+    def _prepare_batch_fields(self, fields: Tuple, instances: List[Any]) -> Tuple:
+        fields = list(fields)
+        for index, field in self._batch_fields:
+            fields[index] = field.prepare_batch(self, fields[index], instances)
+        return tuple(fields)
+
     def to_value(self, instance: Type[Any]) -> Union[Dict, List]:
-        fields: Tuple = self._compiled_fields
+        fields: Tuple = self._prepared_fields
+        if fields is None:
+            fields = self._compiled_fields
+            if self._per_call_fields or self.omit_none:
+                fields = self._prepare_fields(fields)
+        if queries.tracking:
+            fields = queries.instrument(self, fields)
 
+        if self.sideload:
+            return self._serialize_sideloaded(instance, fields)
+        if self._recursive_fields:
+            return self._serialize_tree(instance, fields)
         if self.many:
-            serialize = self._serialize
-            # django orm support for m2m fields
-            if getattr(instance, "iterator", None):
-                return [serialize(o, fields) for o in instance.iterator()]
-            return [serialize(o, fields) for o in instance]
+            if self.lazy:
+                return self._serialize_lazy(instance, fields)
+            return self._serialize_many(instance, fields)
+        if self._batch_fields:
+            fields = self._prepare_batch_fields(fields, [instance])
+        if self.omit_none:
+            return self._serialize_sparse(instance, fields)
         return self._serialize(instance, fields)
 
+    def _compile_to_value(self) -> Callable[[Any], Union[Dict, List]]:
+        """Return the ``to_value`` of the compiled field of a nested serializer.
+
+        Plain nested serializers get a function serializing their objects
+        with the compiled fields directly, so the features of `to_value` are
+        checked once here instead of for every object. `drf_serpy.queries`
+        swaps it back to ``to_value`` with its ``full`` attribute to track the
+        fields of the nested serializer.
+        """
+        if (
+            type(self).to_value is not Serializer.to_value
+            or self._per_call_fields
+            or self._batch_fields
+            or self._recursive_fields
+            or self.sideload
+            or (self.omit_none and self._nested_fields)
+            or (self.many and (self.lazy or self.model is not None or self._annotations))
+            or (
+                # not compiled yet, unless the fields of an expand set shadow them
+                "_compiled_fields" not in self.__dict__
+                and isinstance(type(self).__dict__.get("_compiled_fields"), _LazyCompiledFields)
+            )
+        ):
+            return self.to_value
+        fields = self._compiled_fields
+        serialize = self._serialize_sparse if self.omit_none else self._serialize
+        if self.many:
+            chunk_size = self.chunk_size
+
+            def to_value(instances: Iterable) -> List[Dict]:
+                return [serialize(o, fields) for o in _iter_instances(instances, chunk_size)]
+
+        else:
+
+            def to_value(instance: Any) -> Dict:
+                return serialize(instance, fields)
+
+        to_value.full = self.to_value
+        return to_value
+
+    def _serialize_tree(self, instance: Any, fields: Tuple) -> Union[Dict, List]:
+        """Serialize the objects of a serializer with `RecursiveField` fields
+        level by level, with an explicit list of the nodes of the next level.
+        """
+        serialize = self._serialize_sparse if self.omit_none else self._serialize
+        if self.many:
+            if self._annotations:
+                instance = self.optimize_queryset(instance)
+            roots = list(_iter_instances(instance, self.chunk_size))
+        else:
+            roots = [instance]
+
+        # the recursive fields are set once the node is serialized, the
+        # placeholder keeps their position in the output
+        fields = list(fields)
+        recursive = []
+        for index, field in self._recursive_fields:
+            name, getter, _, call, required, _ = fields[index]
+            recursive.append((name, getter, call, required, field.many, field.max_depth))
+            fields[index] = (name, _none, None, False, True, False)
+        fields = tuple(fields)
+
+        results = [None] * len(roots)
+        # (object, container of its data, key of its data in the container)
+        level = [(root, results, index) for index, root in enumerate(roots)]
+        depth = 0
+        while level:
+            level_fields = fields
+            if self._batch_fields:
+                level_fields = self._prepare_batch_fields(fields, [node[0] for node in level])
+            next_level = []
+            for node, container, key in level:
+                v = container[key] = serialize(node, level_fields)
+                for name, getter, call, required, many, max_depth in recursive:
+                    if max_depth is not None and depth >= max_depth:
+                        v.pop(name, None)
+                        continue
+                    try:
+                        value = getter(node)
+                    except (KeyError, AttributeError):
+                        if required:
+                            raise
+                        v.pop(name, None)
+                        continue
+                    if call:
+                        value = value()
+                    if value is None:
+                        if self.omit_none:
+                            v.pop(name, None)
+                        else:
+                            v[name] = None
+                    elif many:
+                        children = list(_iter_instances(value, self.chunk_size))
+                        v[name] = children_data = [None] * len(children)
+                        next_level.extend(
+                            (child, children_data, index) for index, child in enumerate(children)
+                        )
+                    else:
+                        next_level.append((value, v, name))
+            level = next_level
+            depth += 1
+        return results if self.many else results[0]
+
+    @classmethod
+    def explain(cls, model_or_queryset: Any) -> "Explanation":  # noqa
+        """Estimate the queries the serializer runs on the objects of a
+        Django model or QuerySet, see `drf_serpy.explain.explain`.
+        """
+        from drf_serpy.explain import explain
+
+        return explain(cls, model_or_queryset)
+
+    @classmethod
+    def optimize_queryset(cls, queryset: Any) -> Any:
+        """Annotate a Django QuerySet with the expressions of the
+        `AnnotatedField` fields of the serializer.
+
+        Annotations already on the QuerySet are kept. QuerySets that are
+        evaluated, or prefetched related managers, are returned unchanged
+        since annotating them would run a new query; other objects too.
+        """
+        if not cls._annotations:
+            return queryset
+        queryset = _resolve_related_manager(queryset)
+        if getattr(queryset, "_result_cache", True) is not None:
+            return queryset
+        annotations = {
+            name: expression
+            for name, expression in cls._annotations.items()
+            if name not in queryset.query.annotations
+        }
+        return queryset.annotate(**annotations) if annotations else queryset
+
+    @classmethod
+    def _get_columns(cls) -> FrozenSet[str]:
+        if "_columns" not in cls.__dict__:
+            cls._columns = _compile_columns(cls)
+        return cls._columns
+
+    def _check_deferred(self, instances: Any):
+        """Raise or warn, see `Serializer.on_deferred`, if ``instances`` is a
+        QuerySet deferring columns read by the fields.
+        """
+        query = getattr(instances, "query", None)
+        deferred_loading = getattr(query, "deferred_loading", None)
+        if not deferred_loading or (deferred_loading[1] and not deferred_loading[0]):
+            return
+        names, defer = deferred_loading
+        columns = self._get_columns()
+        field_names = _get_field_names(query.model)
+        if defer:
+            # "author__username" defers a column of the related model
+            deferred = columns & {field_names.get(name) for name in names}
+        else:
+            # "author__username" loads the foreign key column, and .only()
+            # always loads the primary key
+            loaded = {field_names.get(name.split("__", 1)[0]) for name in names}
+            deferred = columns - loaded - {query.model._meta.pk.name}
+        if not deferred:
+            return
+        message = "{0} reads {1} deferred on the {2} QuerySet, which queries every object".format(
+            type(self).__name__, ", ".join(sorted(deferred)), query.model.__name__
+        )
+        if self.on_deferred == "warn":
+            warnings.warn(message, RuntimeWarning, stacklevel=2)
+        else:
+            raise RuntimeError(message)
+
+    def _serialize_many(self, instances: Iterable, fields: Tuple) -> List[Dict]:
+        serialize = self._serialize_sparse if self.omit_none else self._serialize
+        if self.model is not None:
+            self._check_deferred(instances)
+        if self._annotations:
+            instances = self.optimize_queryset(instances)
+        # django orm support for querysets and m2m fields
+        instances = _iter_instances(instances, self.chunk_size)
+        if self._batch_fields:
+            instances = list(instances)
+            fields = self._prepare_batch_fields(fields, instances)
+        return [serialize(o, fields) for o in instances]
+
+    def _serialize_lazy(self, instances: Iterable, fields: Tuple) -> LazyList:
+        serialize = self._serialize_sparse if self.omit_none else self._serialize
+        if self.model is not None:
+            self._check_deferred(instances)
+        if self._annotations:
+            instances = self.optimize_queryset(instances)
+        instances = _iter_instances(instances, self.chunk_size)
+        if not self._batch_fields:
+            # objects are fetched as their rows are accessed
+            return LazyList(instances, serialize=lambda instance: serialize(instance, fields))
+
+        def bind(instances: List[Any]) -> Callable[[Any], Dict]:
+            # batch fields are resolved once for all the objects
+            bound_fields = self._prepare_batch_fields(fields, instances)
+            return lambda instance: serialize(instance, bound_fields)
+
+        return LazyList(instances, bind)
+
     @classmethod
     def to_schema(cls: SerializerMeta, many: bool = False, *args, **kwargs) -> openapi.Response:
         properties = {}
         maps = cls._field_map
         for name, getter, *_ in cls._compiled_fields:
             field = maps[name]
-            if isinstance(field, Serializer):
+            if _is_collapsed(field):
+                # rendered as the primary key unless the field is expanded
+                properties[name] = _collapsed_field(field).get_schema()
+            elif isinstance(field, Serializer):
                 # this is for using a blank serializer.Serializer class
                 # in your serpy Serializers to generate schema without
                 #  depending on one single serializer
@@ -191,6 +1053,9 @@ class Serializer(SerializerBase, metaclass=SerializerMeta):
                 assert (
                     return_type is not None
                 ), f"Declare a return type annotation for field `{name}` of {cls}!"
+                if isinstance(field, BatchMethodField) and hasattr(return_type, "__args__"):
+                    # the values of the returned mapping are serialized
+                    return_type = return_type.__args__[-1]
                 if return_type in SCHEMA_MAPPER.keys():
                     properties[name] = openapi.Schema(type=SCHEMA_MAPPER[return_type])
                     continue
@@ -233,17 +1098,101 @@ class Serializer(SerializerBase, metaclass=SerializerMeta):
             )
         return openapi.Response(cls.__mro__[0].__doc__, schema=schema)
 
+    @classmethod
+    def _get_prototype(cls, many: bool) -> "Serializer":
+        # instances shared by the calls of `serialize_one` and `serialize_many`, never mutated
+        key = "_many_prototype" if many else "_one_prototype"
+        prototype = cls.__dict__.get(key)
+        if prototype is None:
+            prototype = cls(many=many)
+            setattr(cls, key, prototype)
+        return prototype
+
+    def _bind_call(self, context: Optional[Dict]) -> "Serializer":
+        if not (self.per_call or self._batch_fields):
+            # none of the fields, or of the nested serializers, get the serializer
+            return self
+        # methods get a copy bound to the call
+        return self._bound_copy(context)
+
+    def _bind_to(self, serializer: "Serializer") -> "Serializer":
+        # a copy of a nested serializer for a call of its parent
+        bound = self._bound_copy(serializer.context)
+        if serializer.omit_none:
+            bound.omit_none = True
+        return bound
+
+    def _bound_copy(self, context: Optional[Dict]) -> "Serializer":
+        # a shallow copy without the overhead of `copy.copy`
+        bound = object.__new__(type(self))
+        bound.__dict__.update(self.__dict__)
+        bound.context = context
+        return bound
+
+    @classmethod
+    def serialize_one(cls, instance: Any, context: Dict = None) -> Dict:
+        """Serialize a single object, like ``cls(instance, context=context).data``
+        without creating a serializer for the call or caching the result.
+
+        The call runs on an instance of the class created once, copied only
+        when methods of the serializer are called with it, so it is cheap
+        enough for tight loops or background tasks. `drf_serpy.metrics` and `drf_serpy.queries` only
+        sample ``.data`` calls and don't see it.
+
+        Example:
+        ```py
+        rows = [PostSerializer.serialize_one(post) for post in posts]
+        ```
+        :param instance: The object to serialize.
+        :param dict context: The context of the call, see `Serializer`.
+        """
+        serializer = cls._get_prototype(False)._bind_call(context)
+        return serializer.to_value(instance)
+
+    @classmethod
+    def serialize_many(cls, instances: Iterable, context: Dict = None) -> List[Dict]:
+        """Serialize a collection of objects, like
+        ``cls(instances, many=True, context=context).data``, see `serialize_one`.
+
+        :param instances: The objects to serialize, e.g. a list or a QuerySet.
+        :param dict context: The context of the call, see `Serializer`.
+        """
+        serializer = cls._get_prototype(True)._bind_call(context)
+        return serializer.to_value(instances)
+
     @property
     def data(self) -> Dict:
         """Get the serialized data from the `Serializer`.
 
-        The data will be cached for future accesses.
+        The data will be cached for future accesses. If a `drf_serpy.metrics`
+        sink is configured, sampled calls are timed and reported to it. If
+        `drf_serpy.queries` tracking is on, the queries of sampled calls are
+        checked against `Serializer.query_budget`.
         """
         # Cache the data for next time .data is called.
         if self._data is None:
-            self._data = self.to_value(self.instance)
+            policy = queries.sample()
+            if policy is None:
+                self._data = self._measured_to_value()
+            else:
+                self._data = policy.run(type(self), self._measured_to_value)
         return self._data
 
+    def _measured_to_value(self) -> Union[Dict, List]:
+        if self.many and self.lazy and not self.sideload:
+            # a LazyList serializes its objects after .data returns, and
+            # counting them would fetch every one of them
+            return self.to_value(self.instance)
+        sink = metrics.sample()
+        if sink is None:
+            return self.to_value(self.instance)
+        start = time.perf_counter()
+        data = self.to_value(self.instance)
+        seconds = time.perf_counter() - start
+        rows = data["data"] if self.sideload else data
+        sink.record(type(self), seconds, len(rows) if self.many else 1)
+        return data
+
 
 class DictSerializer(Serializer):
     """`DictSerializer` serializes python ``dicts`` instead of objects.
@@ -0,0 +1,129 @@
+from typing import Any, Dict, List, Set, Type
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import joinedload, load_only, selectinload
+
+from drf_serpy.fields import RelatedIdField
+from drf_serpy.serializer import Serializer
+
+
+class _LoadNode(object):
+    """The columns and relationships of one mapper read by a serializer tree."""
+
+    def __init__(self):
+        self.columns: Set[str] = set()
+        self.relationships: Dict[str, "_LoadNode"] = {}
+        # set if something reads the object in a way we can't see through,
+        # e.g. a MethodField, so every column has to be loaded
+        self.opaque = False
+
+    def relationship(self, name: str) -> "_LoadNode":
+        node = self.relationships.get(name)
+        if node is None:
+            node = self.relationships[name] = _LoadNode()
+        return node
+
+
+def _add_path(node: _LoadNode, mapper: Any, path: List[str], serializer_cls: Type[Serializer]):
+    """Record that the object of ``mapper`` is read at the dotted ``path``,
+    and serialized by ``serializer_cls`` if it is a nested serializer.
+    """
+    for i, name in enumerate(path):
+        if name in mapper.relationships:
+            relationship = mapper.relationships[name]
+            # the columns joining both sides have to be loaded for the relationship
+            for column in relationship.local_columns:
+                _add_column(node, mapper, column)
+            node = node.relationship(name)
+            for column in relationship.remote_side:
+                _add_column(node, relationship.mapper, column)
+            mapper = relationship.mapper
+        elif name in mapper.column_attrs and i == len(path) - 1:
+            node.columns.add(name)
+            return
+        else:
+            node.opaque = True
+            return
+
+    if serializer_cls is not None:
+        _collect(node, mapper, serializer_cls)
+    else:
+        # a related object is returned as it is
+        node.opaque = True
+
+
+def _add_column(node: _LoadNode, mapper: Any, column: Any):
+    try:
+        node.columns.add(mapper.get_property_by_column(column).key)
+    except Exception:  # noqa
+        # columns of an association table aren't mapped
+        pass
+
+
+def _collect(node: _LoadNode, mapper: Any, serializer_cls: Type[Serializer]):
+    for name, field in serializer_cls._field_map.items():
+        if field.per_call and not isinstance(field, Serializer):
+            # constant and context fields don't read the object
+            continue
+        if field.getter_takes_serializer or field.call:
+            node.opaque = True
+            continue
+
+        attr = field.attr or name
+        if field.loader is not None or (isinstance(field, RelatedIdField) and not field.many):
+            # only the foreign key is read
+            key = field.key or "{0}_id".format(attr)
+            if callable(key):
+                node.opaque = True
+            else:
+                _add_path(node, mapper, key.split("."), None)
+            continue
+
+        nested = type(field) if isinstance(field, Serializer) else None
+        _add_path(node, mapper, attr.split("."), nested)
+
+
+def _to_options(node: _LoadNode, mapper: Any, columns: bool) -> List[Any]:
+    options = []
+    for name, child in node.relationships.items():
+        relationship = mapper.relationships[name]
+        attribute = getattr(mapper.class_, name)
+        # collections are loaded with one extra query, scalars with a join
+        loader = selectinload(attribute) if relationship.uselist else joinedload(attribute)
+        child_options = _to_options(child, relationship.mapper, columns)
+        if child_options:
+            loader = loader.options(*child_options)
+        options.append(loader)
+
+    if columns and not node.opaque:
+        names = node.columns | {mapper.get_property_by_column(c).key for c in mapper.primary_key}
+        options.append(load_only(*[getattr(mapper.class_, n) for n in sorted(names)]))
+    return options
+
+
+def load_options(
+    serializer_cls: Type[Serializer], model: Type[Any], columns: bool = True
+) -> List[Any]:
+    """Build SQLAlchemy loader options for everything ``serializer_cls`` reads.
+
+    Relationships used by nested serializers or dotted ``attr`` fields are
+    eager loaded, collections with ``selectinload`` and scalars with
+    ``joinedload``, so serializing the results of a query runs a fixed
+    number of queries. Unless ``columns`` is ``False``, ``load_only`` limits
+    each entity to the columns the serializer reads; entities read by a
+    `MethodField` or a ``call`` field load all their columns since we can't
+    know what they read.
+
+    Example:
+    ```py
+    stmt = select(Post).options(*load_options(PostSerializer, Post))
+    PostSerializer(session.scalars(stmt).unique(), many=True).data
+    ```
+    :param serializer_cls: The `Serializer` the results are serialized with.
+    :param model: The mapped class that is selected.
+    :param bool columns: Whether to add ``load_only`` options.
+    """
+    mapper = inspect(model)
+    root = _LoadNode()
+    _collect(root, mapper, serializer_cls)
+    return _to_options(root, mapper, columns)
@@ -24,17 +24,19 @@ class ReadOnlyPostSerializer(drf_serpy.Serializer):
     """
 
     id = drf_serpy.IntField()
-    author = UserSerializer()
+    # rendered as ids unless requested with ?expand=author,tags
+    author = UserSerializer(expandable=True)
     title = drf_serpy.StrField()
     content = drf_serpy.StrField()
     image = drf_serpy.ImageField()
-    tags = TagSerializer(many=True)
+    tags = TagSerializer(many=True, expandable=True)
     created = drf_serpy.DateTimeField()
     updated = drf_serpy.DateTimeField()
-    dummy = drf_serpy.MethodField()
+    dummy = drf_serpy.MethodField(per_call=True)
     is_completed = drf_serpy.MethodField()
 
-    def get_dummy(self, value) -> List[int]:
+    # per_call methods are evaluated once for all the serialized posts
+    def get_dummy(self) -> List[int]:
         return list(range(1, 10))
 
     # typing is necessary to create schema, otherwise method field schema's will default to returning str
@@ -49,16 +51,3 @@ class CommentSerializer(drf_serpy.Serializer):
     comment = drf_serpy.StrField()
     created = drf_serpy.DateTimeField()
     updated = drf_serpy.DateTimeField()
-
-
-class LinkSerializer(drf_serpy.Serializer):
-    next = drf_serpy.StrField()
-    previous = drf_serpy.StrField()
-
-
-class PaginationSerializer(drf_serpy.Serializer):
-    links = LinkSerializer()
-    count = drf_serpy.IntField()
-    current_page = drf_serpy.IntField()
-    page_size = drf_serpy.IntField()
-    results = drf_serpy.Serializer()
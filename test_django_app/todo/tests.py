@@ -1,8 +1,31 @@
+import base64
+import io
+import json
+from collections import defaultdict
+from typing import Dict
+
+import drf_serpy
 from django.conf import settings
+from django.contrib.contenttypes.fields import GenericForeignKey, GenericRelation
+from django.contrib.contenttypes.models import ContentType
 from django.core.files.uploadedfile import SimpleUploadedFile
-from rest_framework.test import APITestCase
+from django.db import models
+from django.db.models import Count, Exists, OuterRef
+from django.test.utils import isolate_apps
+from drf_serpy import export, queries
+from drf_serpy.pagination import KeysetPagination, PaginationSerializer
+from drf_serpy.queries import QueryBudgetExceeded
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, APITestCase
 
 from .models import Comment, Post, Tag, User
+from .serializers.serps import (
+    CommentSerializer,
+    ReadOnlyPostSerializer,
+    TagSerializer,
+    UserSerializer,
+)
 
 
 class ViewSetsTestCase(APITestCase):
@@ -52,3 +75,542 @@ class ViewSetsTestCase(APITestCase):
     def test_comment(self):
         response = self.client.get("/api/comment/")
         print(response.data)
+
+
+class TagPagination(KeysetPagination):
+    page_size = 4
+
+
+class KeysetPaginationTestCase(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for t in range(10):
+            Tag.objects.create(name=f"Tag-{t}")
+        # equal keys across a page boundary have to be resolved by the pk
+        tie = Tag.objects.order_by("pk")[3]
+        Tag.objects.filter(pk__lte=tie.pk + 2).update(created=tie.created)
+
+    def paginate(self, url, paginator=None, queryset=None):
+        paginator = paginator or TagPagination()
+        request = Request(APIRequestFactory().get(url))
+        queryset = Tag.objects.all() if queryset is None else queryset
+        page = paginator.paginate_queryset(queryset, request)
+        return paginator, page
+
+    def test_walks_all_pages_in_order(self):
+        expected = list(Tag.objects.order_by("-created", "-pk").values_list("pk", flat=True))
+        seen, url = [], "/tags/"
+        while url:
+            with self.assertNumQueries(1):
+                paginator, page = self.paginate(url)
+            seen.extend(tag.pk for tag in page)
+            url = paginator.get_next_link()
+        self.assertEqual(seen, expected)
+
+    def test_previous_link(self):
+        paginator, first = self.paginate("/tags/")
+        self.assertIsNone(paginator.get_previous_link())
+        paginator, second = self.paginate(paginator.get_next_link())
+        paginator, previous = self.paginate(paginator.get_previous_link())
+        self.assertEqual([t.pk for t in previous], [t.pk for t in first])
+        self.assertIsNotNone(paginator.get_next_link())
+
+    def test_count(self):
+        paginator = TagPagination()
+        paginator.include_count = True
+        with self.assertNumQueries(2):
+            paginator, page = self.paginate("/tags/", paginator)
+        self.assertEqual(paginator.get_envelope(page)["count"], 10)
+        self.assertNotIn("count", self.paginate("/tags/")[0].get_envelope(page))
+
+    def test_invalid_cursor(self):
+        with self.assertRaises(NotFound):
+            self.paginate("/tags/?cursor=garbage")
+        tampered = base64.urlsafe_b64encode(json.dumps({"v": ["abc", 1]}).encode("utf-8"))
+        with self.assertRaises(NotFound):
+            self.paginate("/tags/?cursor=" + tampered.decode("ascii"))
+        tampered = base64.urlsafe_b64encode(json.dumps({"v": [None, None]}).encode("utf-8"))
+        with self.assertRaises(NotFound):
+            self.paginate("/tags/?cursor=" + tampered.decode("ascii"))
+
+    def test_nullable_ordering(self):
+        user = User.objects.create(username="keyset")
+        for i, image in enumerate(["b.png", "n", "a.png", "n", "c.png", "d.png", "n"]):
+            Post.objects.create(author=user, title=f"Post-{i}", content="Content", image=image)
+        Post.objects.filter(image="n").update(image=None)
+        posts = list(Post.objects.all())
+        non_null = sorted((p for p in posts if p.image), key=lambda p: (p.image.name, p.pk))
+        null = sorted((p for p in posts if not p.image), key=lambda p: p.pk)
+
+        for ordering, expected in (
+            ("image", non_null + null),
+            ("-image", null[::-1] + non_null[::-1]),
+        ):
+            paginator = TagPagination()
+            paginator.ordering = (ordering,)
+            paginator.page_size = 2
+            pages, url = [], "/posts/"
+            while url:
+                paginator, page = self.paginate(url, paginator, Post.objects.all())
+                pages.append([p.pk for p in page])
+                url = paginator.get_next_link()
+            self.assertEqual(sum(pages, []), [p.pk for p in expected])
+
+            # and back to the first page
+            previous = pages[-2::-1]
+            for page_pks in previous:
+                paginator, page = self.paginate(
+                    paginator.get_previous_link(), paginator, Post.objects.all()
+                )
+                self.assertEqual([p.pk for p in page], page_pks)
+
+    def test_pagination_serializer(self):
+        paginator, page = self.paginate("/tags/")
+        data = PaginationSerializer.wrap(TagSerializer)(paginator.get_envelope(page)).data
+        self.assertEqual(data["previous"], None)
+        self.assertIn("cursor=", data["next"])
+        self.assertEqual([t["id"] for t in data["results"]], [t.pk for t in page])
+        self.assertIs(
+            PaginationSerializer.wrap(TagSerializer), PaginationSerializer.wrap(TagSerializer)
+        )
+
+
+class PostTagsSerializer(drf_serpy.Serializer):
+    id = drf_serpy.IntField()
+    author = UserSerializer()
+    tags = TagSerializer(many=True)
+
+
+class PrefetchIterationTestCase(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create(username="prefetch")
+        for p in range(5):
+            post = Post.objects.create(author=user, title=f"Post-{p}", content="Content")
+            for t in range(3):
+                post.tags.add(Tag.objects.create(name=f"Tag-{p}-{t}"))
+
+    def test_prefetched_many_field(self):
+        queryset = Post.objects.select_related("author").prefetch_related("tags")
+        with self.assertNumQueries(2):
+            data = PostTagsSerializer(queryset, many=True).data
+        self.assertEqual(len(data), 5)
+        self.assertEqual([len(post["tags"]) for post in data], [3] * 5)
+
+    def test_prefetched_chunks(self):
+        queryset = Post.objects.select_related("author").prefetch_related("tags")
+        # one query for the posts and one prefetch query for each chunk
+        with self.assertNumQueries(4):
+            data = PostTagsSerializer(queryset, many=True, chunk_size=2).data
+        self.assertEqual(len(data), 5)
+
+    def test_evaluated_queryset(self):
+        queryset = Post.objects.select_related("author").prefetch_related("tags")
+        list(queryset)
+        with self.assertNumQueries(0):
+            PostTagsSerializer(queryset, many=True).data
+
+    def test_not_prefetched(self):
+        queryset = Post.objects.select_related("author")
+        with self.assertNumQueries(6):
+            PostTagsSerializer(queryset, many=True).data
+
+
+class PostCommentCountSerializer(drf_serpy.Serializer):
+    id = drf_serpy.IntField()
+    comment_count = drf_serpy.BatchMethodField(key="pk")
+
+    def get_comment_count(self, posts) -> Dict[int, int]:
+        counts = (
+            Comment.objects.filter(post__in=posts)
+            .order_by()
+            .values_list("post_id")
+            .annotate(count=Count("pk"))
+        )
+        return defaultdict(int, counts)
+
+
+class CommentPostCountSerializer(drf_serpy.Serializer):
+    post = PostCommentCountSerializer()
+
+
+class BatchMethodFieldTestCase(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create(username="batch")
+        for p in range(4):
+            post = Post.objects.create(author=user, title=f"Post-{p}", content="Content")
+            for c in range(p):
+                Comment.objects.create(user=user, post=post, comment=f"Comment-{c}")
+
+    def test_single_query(self):
+        with self.assertNumQueries(2):
+            data = PostCommentCountSerializer(Post.objects.order_by("pk"), many=True).data
+        self.assertEqual([post["comment_count"] for post in data], [0, 1, 2, 3])
+
+    def test_nested(self):
+        queryset = Comment.objects.select_related("post").order_by("pk")
+        explanation = CommentPostCountSerializer.explain(queryset)
+        self.assertEqual(explanation.batched, ["post.comment_count"])
+        # one query for the comments, one for the counts of all their posts
+        with self.assertNumQueries(explanation.fixed_queries):
+            data = CommentPostCountSerializer(queryset, many=True).data
+        self.assertEqual([comment["post"]["comment_count"] for comment in data], [1, 2, 2, 3, 3, 3])
+
+
+class ExpandTestCase(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username="expand")
+        for p in range(3):
+            post = Post.objects.create(
+                author=cls.user, title=f"Post-{p}", content="Content", image="1_26IDSLU.png"
+            )
+            for t in range(2):
+                post.tags.add(Tag.objects.create(name=f"Tag-{p}-{t}"))
+
+    def test_collapsed(self):
+        queryset = Post.objects.order_by("pk")
+        # the author id is read from author_id, the tag ids with one
+        # values_list query per post
+        with self.assertNumQueries(4):
+            data = ReadOnlyPostSerializer(queryset, many=True).data
+        self.assertEqual(data[0]["author"], self.user.pk)
+        post = Post.objects.order_by("pk").first()
+        self.assertEqual(sorted(data[0]["tags"]), sorted(post.tags.values_list("pk", flat=True)))
+
+        with self.assertNumQueries(2):
+            prefetched = ReadOnlyPostSerializer(queryset.prefetch_related("tags"), many=True).data
+        self.assertEqual([sorted(p["tags"]) for p in prefetched], [sorted(p["tags"]) for p in data])
+
+    def test_expanded(self):
+        queryset = Post.objects.order_by("pk").select_related("author").prefetch_related("tags")
+        with self.assertNumQueries(2):
+            data = ReadOnlyPostSerializer(queryset, many=True, expand="author,tags").data
+        self.assertEqual(data[0]["author"]["username"], "expand")
+        self.assertEqual(len(data[0]["tags"]), 2)
+        self.assertIn("name", data[0]["tags"][0])
+
+
+class PostIdsSerializer(drf_serpy.Serializer):
+    model = Post
+
+    id = drf_serpy.IntField()
+    author = drf_serpy.RelatedIdField()
+    tags = drf_serpy.RelatedIdField(many=True)
+
+
+class CommentIdsSerializer(drf_serpy.Serializer):
+    model = Comment
+
+    post = drf_serpy.RelatedIdField()
+    post_author = drf_serpy.RelatedIdField(attr="post.author")
+
+
+class RelatedIdFieldTestCase(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username="ids")
+        for p in range(3):
+            post = Post.objects.create(author=cls.user, title=f"Post-{p}", content="Content")
+            post.tags.add(Tag.objects.create(name=f"Tag-{p}"))
+            Comment.objects.create(user=cls.user, post=post, comment="Comment")
+
+    def test_related_ids(self):
+        queryset = Post.objects.order_by("pk").prefetch_related("tags")
+        with self.assertNumQueries(2):
+            data = PostIdsSerializer(queryset, many=True).data
+        post = queryset[0]
+        self.assertEqual(
+            data[0], {"id": post.pk, "author": self.user.pk, "tags": [post.tags.get().pk]}
+        )
+
+        # one values_list query for the tags of each post
+        with self.assertNumQueries(4):
+            self.assertEqual(PostIdsSerializer(Post.objects.order_by("pk"), many=True).data, data)
+
+    def test_model_lookup(self):
+        with self.assertNumQueries(1):
+            data = CommentIdsSerializer(Comment.objects.select_related("post"), many=True).data
+        self.assertEqual(data[0]["post_author"], self.user.pk)
+
+        with self.assertRaises(ValueError):
+
+            class InvalidSerializer(drf_serpy.Serializer):
+                model = Post
+                title = drf_serpy.RelatedIdField()
+
+
+class SideloadTestCase(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        users = [User.objects.create(username=f"sideload-{u}") for u in range(2)]
+        post = Post.objects.create(
+            author=users[0], title="Post", content="Content", image="1_26IDSLU.png"
+        )
+        for c in range(6):
+            Comment.objects.create(user=users[c % 2], post=post, comment=f"Comment-{c}")
+
+    def test_sideload(self):
+        queryset = Comment.objects.select_related("user", "post")
+        # the tag ids of the post are queried once, not for every comment
+        with self.assertNumQueries(2):
+            data = CommentSerializer(queryset, many=True, sideload=True).data
+        self.assertEqual(len(data["data"]), 6)
+        post = data["data"][0]["post"]
+        self.assertEqual({comment["post"] for comment in data["data"]}, {post})
+        self.assertEqual(list(data["included"]["ReadOnlyPostSerializer"]), [post])
+        self.assertEqual(len(data["included"]["UserSerializer"]), 2)
+        # the author of the post is an expandable field rendered as its id
+        author = data["included"]["ReadOnlyPostSerializer"][post]["author"]
+        self.assertIn(author, data["included"]["UserSerializer"])
+
+
+class PostAnnotatedSerializer(drf_serpy.Serializer):
+    id = drf_serpy.IntField()
+    comment_count = drf_serpy.AnnotatedField(Count("comment"))
+    is_commented = drf_serpy.AnnotatedField(
+        Exists(Comment.objects.filter(post=OuterRef("pk"))), attr="has_comments"
+    )
+
+
+class AnnotatedFieldTestCase(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create(username="annotated")
+        for p in range(3):
+            post = Post.objects.create(author=user, title=f"Post-{p}", content="Content")
+            for c in range(p):
+                Comment.objects.create(user=user, post=post, comment=f"Comment-{c}")
+
+    def test_annotated(self):
+        with self.assertNumQueries(1):
+            data = PostAnnotatedSerializer(Post.objects.order_by("pk"), many=True).data
+        self.assertEqual([post["comment_count"] for post in data], [0, 1, 2])
+        self.assertEqual([post["is_commented"] for post in data], [False, True, True])
+
+    def test_optimize_queryset(self):
+        queryset = PostAnnotatedSerializer.optimize_queryset(Post.objects.order_by("pk"))
+        self.assertEqual(set(queryset.query.annotations), {"comment_count", "has_comments"})
+        with self.assertNumQueries(1):
+            data = PostAnnotatedSerializer(queryset.last()).data
+        self.assertEqual(data["comment_count"], 2)
+
+        evaluated = Post.objects.all()
+        list(evaluated)
+        self.assertIs(PostAnnotatedSerializer.optimize_queryset(evaluated), evaluated)
+
+    def test_schema(self):
+        properties = PostAnnotatedSerializer.to_schema().schema.properties
+        self.assertEqual(properties["comment_count"]["type"], "integer")
+        self.assertEqual(properties["is_commented"]["type"], "boolean")
+
+
+def create_comments():
+    user = User.objects.create(username="explain")
+    for p in range(3):
+        post = Post.objects.create(
+            author=user, title=f"Post-{p}", content="Content", image="1_26IDSLU.png"
+        )
+        post.tags.add(Tag.objects.create(name=f"Tag-{p}"))
+        Comment.objects.create(user=user, post=post, comment="Comment")
+
+
+class BookmarkSerializer(drf_serpy.Serializer):
+    object_id = drf_serpy.IntField()
+    label = drf_serpy.StrField()
+    content_object = drf_serpy.StrField()
+    bookmarks = drf_serpy.Serializer(many=True)
+
+
+class ExplainTestCase(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_comments()
+
+    def test_explain(self):
+        explanation = CommentSerializer.explain(Comment)
+        self.assertEqual(explanation.n_plus_one, ["user", "post", "post__tags"])
+        self.assertEqual(explanation.opaque, ["post.is_completed"])
+        self.assertEqual(explanation.queries_per_row, 3)
+        self.assertEqual(
+            explanation.relations[2],
+            ("post__tags", "m2m", True, None),
+        )
+        self.assertIn("post__tags  m2m      N+1", str(explanation))
+        with self.assertNumQueries(1 + 3 * 3):
+            CommentSerializer(Comment.objects.all(), many=True).data
+
+    def test_covered(self):
+        queryset = Comment.objects.select_related("user", "post").prefetch_related("post__tags")
+        explanation = CommentSerializer.explain(queryset)
+        self.assertEqual(explanation.n_plus_one, [])
+        self.assertEqual(
+            [relation.covered_by for relation in explanation.relations],
+            ["select_related", "select_related", "prefetch_related"],
+        )
+        with self.assertNumQueries(explanation.fixed_queries):
+            CommentSerializer(queryset, many=True).data
+
+    def test_batched(self):
+        explanation = PostCommentCountSerializer.explain(Post.objects)
+        self.assertEqual(explanation.batched, ["comment_count"])
+        self.assertEqual(explanation.fixed_queries, 2)
+        self.assertEqual(PostIdsSerializer.explain(Post).n_plus_one, ["tags"])
+        self.assertEqual(PostAnnotatedSerializer.explain(Post).relations, [])
+
+    @isolate_apps("todo")
+    def test_generic_relations(self):
+        class Bookmark(models.Model):
+            # only used to explain serializers, in an app registry of its own
+            content_type = models.ForeignKey(
+                ContentType, on_delete=models.CASCADE, related_name="+"
+            )
+            object_id = models.PositiveIntegerField()
+            content_object = GenericForeignKey()
+            bookmarks = GenericRelation("Bookmark")
+
+            @property
+            def label(self):
+                return str(self.object_id)
+
+        explanation = BookmarkSerializer.explain(Bookmark)
+        self.assertEqual(explanation.opaque, ["label", "content_object"])
+        self.assertEqual(explanation.relations, [("bookmarks", "reverse", True, None)])
+
+
+class QueryBudgetTestCase(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_comments()
+
+    def test_n_plus_one(self):
+        with self.assertRaises(QueryBudgetExceeded) as raised:
+            with queries.track():
+                CommentSerializer(Comment.objects.all(), many=True).data
+        report = raised.exception.report
+        self.assertEqual(report.count, 10)
+        self.assertEqual(report.by_field()[(CommentSerializer, None)], 1)
+        self.assertEqual(
+            [(serializer_cls, name) for serializer_cls, name, _ in report.n_plus_one],
+            [
+                (CommentSerializer, "user"),
+                (CommentSerializer, "post"),
+                (ReadOnlyPostSerializer, "tags"),
+            ],
+        )
+
+    def test_budget(self):
+        queryset = Comment.objects.select_related("user", "post").prefetch_related("post__tags")
+        with queries.track(budget=2) as reports:
+            CommentSerializer(queryset, many=True).data
+        self.assertEqual(reports[0].count, 2)
+        with self.assertRaises(QueryBudgetExceeded):
+            with queries.track(budget=1):
+                CommentSerializer(queryset.all(), many=True).data
+
+
+class PostColumnsSerializer(drf_serpy.Serializer):
+    id = drf_serpy.IntField()
+    author = UserSerializer()
+    headline = drf_serpy.StrField(attr="title")
+    content = drf_serpy.Field()
+    image = drf_serpy.ImageField()
+    author_id = drf_serpy.IntField()
+    created = drf_serpy.DateTimeField()
+    is_long = drf_serpy.Field(attr="content.__len__", call=True)
+
+
+class PostModelColumnsSerializer(PostColumnsSerializer):
+    model = Post
+
+
+class PostAuthorIdSerializer(drf_serpy.Serializer):
+    id = drf_serpy.IntField()
+    title = drf_serpy.StrField()
+    author_id = drf_serpy.IntField()
+    model = Post
+
+
+class ColumnsTestCase(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_comments()
+
+    def test_columns(self):
+        self.assertEqual(
+            PostModelColumnsSerializer._get_columns(),
+            {"id", "title", "content", "image", "author", "created"},
+        )
+        queryset = Post.objects.select_related("author").order_by("pk")
+        data = PostModelColumnsSerializer(queryset, many=True).data
+        self.assertEqual(data, PostColumnsSerializer(queryset, many=True).data)
+        self.assertTrue(data[0]["image"].endswith("1_26IDSLU.png"))
+
+        # the foreign key column is read from the __dict__ of the post
+        post = Post.objects.only("id").get(pk=data[0]["id"])
+        getter = PostModelColumnsSerializer._compiled_fields[5][1]
+        self.assertIsNot(getter, PostColumnsSerializer._compiled_fields[5][1])
+        with self.assertNumQueries(1):
+            # deferred, read through the descriptor
+            self.assertEqual(getter(post), data[0]["author_id"])
+        with self.assertNumQueries(0):
+            self.assertEqual(getter(post), data[0]["author_id"])
+
+    def test_deferred(self):
+        queryset = Post.objects.select_related("author").only("id", "author", "title", "image")
+        with self.assertNumQueries(0):
+            with self.assertRaises(RuntimeError) as raised:
+                PostModelColumnsSerializer(queryset, many=True).data
+        self.assertIn("content, created", str(raised.exception))
+        with self.assertRaises(RuntimeError):
+            PostModelColumnsSerializer(Post.objects.defer("created"), many=True).data
+
+        serializer = PostModelColumnsSerializer(queryset, many=True)
+        serializer.on_deferred = "warn"
+        with self.assertWarns(RuntimeWarning):
+            # the deferred columns are loaded by a query for each post
+            with self.assertNumQueries(1 + 3 * 2):
+                data = serializer.data
+        self.assertEqual(data[0]["content"], "Content")
+        # columns that aren't read can be deferred
+        PostModelColumnsSerializer(Post.objects.defer("updated"), many=True).data
+
+    def test_related_lookups(self):
+        queryset = Post.objects.select_related("author").only("id", "title", "author__username")
+        with self.assertNumQueries(1):
+            data = PostAuthorIdSerializer(queryset, many=True).data
+        self.assertEqual(len(data), 3)
+        with self.assertNumQueries(1):
+            PostAuthorIdSerializer(Post.objects.only("id", "title", "author_id"), many=True).data
+        with self.assertNumQueries(1):
+            PostAuthorIdSerializer(Post.objects.defer("author__username"), many=True).data
+        with self.assertRaises(RuntimeError):
+            PostAuthorIdSerializer(Post.objects.defer("author_id"), many=True).data
+
+
+class ExportTestCase(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_comments()
+
+    def test_csv(self):
+        queryset = (
+            Comment.objects.order_by("pk")
+            .select_related("user", "post")
+            .prefetch_related("post__tags")
+        )
+        file = io.BytesIO()
+        # the comments are fetched in chunks of 2, the tags are prefetched for each chunk
+        with self.assertNumQueries(3):
+            export.write_csv(CommentSerializer(queryset, many=True, chunk_size=2), file)
+        lines = file.getvalue().decode("utf-8").splitlines()
+        self.assertEqual(len(lines), 4)
+        self.assertTrue(lines[0].startswith("id,user.id,user.username,user.email,"))
+        self.assertIn(",post.id,post.author,post.title,", lines[0])
+        comment = queryset[0]
+        self.assertIn(f",[{comment.post.tags.get().pk}],", lines[1])
+
+        chunks = export.iter_ndjson(CommentSerializer(queryset, many=True))
+        rows = [json.loads(line) for line in b"".join(chunks).splitlines()]
+        self.assertEqual(rows, json.loads(json.dumps(CommentSerializer(queryset, many=True).data)))
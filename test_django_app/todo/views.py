@@ -1,16 +1,19 @@
+from drf_serpy.pagination import KeysetPagination, PaginationSerializer
+from drf_serpy.renderers import SerpyJSONRenderer, SerpyResponse
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework import status
-from rest_framework.response import Response
+from rest_framework.renderers import BrowsableAPIRenderer
 from rest_framework.viewsets import ModelViewSet
 
 from .models import Comment, Post
 from .serializers import drf, serps
-from .serializers.serps import CommentSerializer, PaginationSerializer
+from .serializers.serps import CommentSerializer
 
 
 class PostViewSet(ModelViewSet):
     queryset = Post.objects.all()
     serializer_class = drf.PostSerializer
+    renderer_classes = (SerpyJSONRenderer, BrowsableAPIRenderer)
 
     @swagger_auto_schema(
         responses={
@@ -19,7 +22,11 @@ class PostViewSet(ModelViewSet):
     )
     def list(self, request, *args, **kwargs):
         # get your objects
-        serializer = serps.ReadOnlyPostSerializer(instance=self.queryset.all(), many=True)
+        serializer = serps.ReadOnlyPostSerializer(
+            instance=self.queryset.all(),
+            many=True,
+            expand=request.query_params.get("expand"),
+        )
         # usr = User.objects.create(
         #     password="123456",
         #     username="abcdefg",
@@ -28,7 +35,7 @@ class PostViewSet(ModelViewSet):
         #     email="example@email.com",
         # )
         # Post.objects.create(title="ExamplePost", content="My Content", image="test.jpg", author=usr)
-        return Response(data=serializer.data, status=status.HTTP_200_OK)
+        return SerpyResponse(serializer, status=status.HTTP_200_OK)
 
     @swagger_auto_schema(
         responses={
@@ -37,17 +44,23 @@ class PostViewSet(ModelViewSet):
     )
     def retrieve(self, request, *args, **kwargs):
         # get your objects
-        serializer = serps.ReadOnlyPostSerializer(instance=self.get_object(), many=False)
-        return Response(data=serializer.data, status=status.HTTP_200_OK)
+        serializer = serps.ReadOnlyPostSerializer(
+            instance=self.get_object(),
+            many=False,
+            expand=request.query_params.get("expand"),
+        )
+        return SerpyResponse(serializer, status=status.HTTP_200_OK)
 
 
 class CommentViewSet(ModelViewSet):
     queryset = Comment.objects.all()
     serializer_class = drf.CommentSerializer
+    renderer_classes = (SerpyJSONRenderer, BrowsableAPIRenderer)
+    pagination_class = KeysetPagination
 
     @swagger_auto_schema(
         responses={
-            200: PaginationSerializer.to_schema(serializer=CommentSerializer(many=True)),
+            200: PaginationSerializer.wrap(CommentSerializer).to_schema(),
         },
     )
     def list(self, request, *args, **kwargs):
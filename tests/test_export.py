@@ -0,0 +1,106 @@
+import io
+import json
+import unittest
+from typing import Dict, List
+
+from django.conf import settings
+
+settings.configure()
+
+from drf_serpy import export
+from drf_serpy.fields import BatchMethodField, Field, IntField, JSONField, MethodField
+from drf_serpy.serializer import Serializer
+
+from .obj import Obj
+
+
+class UserSerializer(Serializer):
+    name = Field()
+    age = IntField(required=False)
+
+
+class TagSerializer(Serializer):
+    name = Field()
+
+
+class PostSerializer(Serializer):
+    id = IntField()
+    author = UserSerializer()
+    tags = TagSerializer(many=True)
+    meta = JSONField(encoded=True)
+    rank = BatchMethodField()
+    title = MethodField()
+
+    def get_rank(self, posts: List[Obj]) -> Dict[Obj, int]:
+        self.context["batches"].append(len(posts))
+        return {post: index for index, post in enumerate(posts)}
+
+    def get_title(self, post: Obj) -> str:
+        return "Post, {0}".format(post.id)
+
+
+def make_posts(count: int) -> List[Obj]:
+    return [
+        Obj(
+            id=i,
+            author=Obj(name="user-{0}".format(i), age=None if i % 2 else i),
+            tags=[Obj(name="a"), Obj(name="b")],
+            meta='{"i":%d}' % i,
+        )
+        for i in range(count)
+    ]
+
+
+class TestExport(unittest.TestCase):
+    def test_iter_rows(self):
+        context = {"batches": []}
+        serializer = PostSerializer(make_posts(5), many=True, context=context, chunk_size=2)
+        rows = export.iter_rows(serializer)
+        self.assertEqual(next(rows)["rank"], 0)
+        # batch fields are resolved for each chunk of objects
+        self.assertEqual(context["batches"], [2])
+        self.assertEqual([row["rank"] for row in rows], [1, 0, 1, 0])
+        self.assertEqual(context["batches"], [2, 2, 1])
+
+    def test_ndjson(self):
+        posts = make_posts(50)
+        serializer = PostSerializer(posts, many=True, context={"batches": []})
+        chunks = list(export.iter_ndjson(serializer, buffer_size=1000))
+        self.assertGreater(len(chunks), 1)
+        self.assertTrue(all(len(chunk) >= 1000 for chunk in chunks[:-1]))
+        lines = b"".join(chunks).splitlines()
+        self.assertEqual(len(lines), 50)
+        self.assertEqual(
+            json.loads(lines[1]),
+            {
+                "id": 1,
+                "author": {"name": "user-1", "age": None},
+                "tags": [{"name": "a"}, {"name": "b"}],
+                "meta": {"i": 1},
+                "rank": 1,
+                "title": "Post, 1",
+            },
+        )
+
+        file = io.BytesIO()
+        export.write_ndjson(PostSerializer(posts, many=True, context={"batches": []}), file)
+        self.assertEqual(file.getvalue(), b"".join(chunks))
+
+    def test_csv(self):
+        posts = make_posts(3)
+        file = io.BytesIO()
+        serializer = PostSerializer(posts, many=True, context={"batches": []}, omit_none=True)
+        export.write_csv(serializer, file, buffer_size=10)
+        lines = file.getvalue().decode("utf-8").splitlines()
+        self.assertEqual(lines[0], "id,author.name,author.age,tags,meta,rank,title")
+        self.assertEqual(
+            lines[2], '1,user-1,,"[{""name"":""a""},{""name"":""b""}]","{""i"":1}",1,"Post, 1"'
+        )
+
+        serializer = UserSerializer(Obj(name="a", age=1))
+        chunks = export.iter_csv(serializer, header=False, delimiter=";")
+        self.assertEqual(b"".join(chunks), b"a;1\r\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,17 +1,32 @@
+import base64
+import enum
+import io
 import unittest
+import uuid
+from decimal import Decimal
 
 from django.conf import settings
 
 settings.configure()
 
 from drf_serpy.fields import (
+    Base64Field,
     BoolField,
+    ConstField,
+    ContextField,
+    DecimalField,
+    EnumField,
     Field,
     FloatField,
     IntField,
+    JSONField,
     MethodField,
+    RelatedIdField,
     StrField,
+    UUIDField,
 )
+from drf_serpy.encoders import JSONFragment, dumps
+from drf_serpy.serializer import Serializer
 
 from .obj import Obj
 
@@ -60,6 +75,113 @@ class TestFields(unittest.TestCase):
         self.assertEqual(field.to_value(5.2), 5.2)
         self.assertEqual(field.to_value("5.5"), 5.5)
 
+    def test_decimal_field(self):
+        field = DecimalField()
+        self.assertEqual(field.to_value(Decimal("1.50")), "1.50")
+        # fixed-point notation, like DRF
+        self.assertEqual(field.to_value(Decimal("0.00000010")), "0.00000010")
+        self.assertEqual(field.to_value(Decimal("1E+3")), "1000")
+        self.assertEqual(field.to_value(1e-7), "0.0000001")
+        self.assertEqual(field.get_schema()["format"], "decimal")
+
+        field = DecimalField(decimal_places=1)
+        self.assertEqual(field.to_value(Decimal("1.25")), "1.2")
+        self.assertEqual(field.to_value(2.35), "2.4")
+        self.assertEqual(field.to_value(3), "3.0")
+        self.assertEqual(DecimalField(decimal_places=0).to_value(Decimal("1E+3")), "1000")
+
+        field = DecimalField(decimal_places=2, coerce_to_string=False)
+        self.assertEqual(field.to_value(Decimal("1.255")), 1.26)
+        self.assertEqual(field.get_schema()["type"], "number")
+        self.assertIs(DecimalField(coerce_to_string=False).to_value, float)
+
+    def test_uuid_field(self):
+        value = uuid.UUID("12345678-1234-5678-1234-567812345678")
+        self.assertEqual(UUIDField().to_value(value), "12345678-1234-5678-1234-567812345678")
+        self.assertEqual(UUIDField(hex=True).to_value(value), "12345678123456781234567812345678")
+        self.assertEqual(UUIDField().get_schema()["format"], "uuid")
+
+    def test_enum_field(self):
+        class Color(enum.Enum):
+            RED = "r"
+            GREEN = "g"
+
+        class Size(enum.IntEnum):
+            S = 1
+            M = 2
+
+        field = EnumField(Color)
+        self.assertEqual(field.to_value(Color.RED), "r")
+        self.assertEqual(field.to_value("g"), "g")
+        with self.assertRaises(ValueError):
+            field.to_value("b")
+        self.assertEqual(field.get_schema()["enum"], ["r", "g"])
+
+        field = EnumField(Size, by_name=True)
+        self.assertEqual(field.to_value(Size.M), "M")
+        self.assertEqual(field.to_value(1), "S")
+        self.assertEqual(field.get_schema()["enum"], ["S", "M"])
+        self.assertEqual(EnumField(Size).get_schema()["type"], "integer")
+
+        field = EnumField()
+        self.assertEqual(field.to_value(Size.M), 2)
+        self.assertEqual(field.to_value("raw"), "raw")
+        with self.assertRaises(ValueError):
+            EnumField(by_name=True)
+
+    def test_json_field(self):
+        field = JSONField()
+        self.assertFalse(field._is_to_value_overridden())
+        field = JSONField(encoded=True)
+        self.assertEqual(field.to_value('{"a":1}'), JSONFragment(b'{"a":1}'))
+        self.assertIsInstance(field.to_value(b"[]"), JSONFragment)
+
+    def test_base64_field(self):
+        data = bytes(range(256)) * 41
+        encoded = base64.b64encode(data).decode("ascii")
+        field = Base64Field()
+        self.assertEqual(field.to_value(data), encoded)
+        self.assertEqual(field.to_value(memoryview(data)), encoded)
+        self.assertEqual(field.to_value(b""), "")
+        self.assertEqual(field.get_schema()["format"], "bytes")
+
+        class ShortReads(io.RawIOBase):
+            # returns at most 7 bytes per read, like a socket
+            def __init__(self):
+                self.source = io.BytesIO(data)
+
+            def readable(self):
+                return True
+
+            def readinto(self, buffer):
+                return self.source.readinto(memoryview(buffer)[:7])
+
+        field = Base64Field(chunk_size=100)
+        self.assertEqual(field.chunk_size, 99)
+        self.assertEqual(field.to_value(io.BytesIO(data)), encoded)
+        self.assertEqual(field.to_value(ShortReads()), encoded)
+        self.assertEqual(field.to_value(io.BufferedReader(ShortReads())), encoded)
+
+        field = Base64Field(urlsafe=True, fragment=True)
+        fragment = field.to_value(data)
+        self.assertIsInstance(fragment, JSONFragment)
+        self.assertEqual(fragment, b'"' + base64.urlsafe_b64encode(data) + b'"')
+        self.assertEqual(field.to_value(io.BytesIO(data)), fragment)
+        self.assertEqual(dumps({"a": field.to_value(b"\xfb\xff")}), b'{"a":"-_8="}')
+
+    def test_related_id_field(self):
+        field = RelatedIdField()
+        getter = field.as_getter("author", Serializer)
+        self.assertEqual(getter(Obj(author_id=5)), 5)
+        getter = RelatedIdField(key="author_pk").as_getter("author", Serializer)
+        self.assertEqual(getter(Obj(author_pk=6)), 6)
+        self.assertEqual(field.get_schema()["type"], "integer")
+
+        field = RelatedIdField(many=True, pk_attr="id")
+        getter = field.as_getter("tags", Serializer)
+        self.assertEqual(getter(Obj(tags=[Obj(id=1), Obj(id=2)])), [1, 2])
+        self.assertEqual(field.get_schema()["items"]["type"], "integer")
+
     def test_method_field(self):
         class FakeSerializer(object):
             def get_a(self, obj):
@@ -78,6 +200,21 @@ class TestFields(unittest.TestCase):
 
         self.assertTrue(MethodField.getter_takes_serializer)
 
+    def test_const_field(self):
+        field = ConstField(5)
+        self.assertTrue(field.per_call)
+        self.assertEqual(field.as_getter("a", None)(None), 5)
+        self.assertEqual(field.get_schema().type, "integer")
+        self.assertIsNone(ConstField([1]).get_schema())
+
+    def test_context_field(self):
+        serializer = Obj(context={"a": 1, "b": 2})
+        self.assertTrue(ContextField.per_call)
+        self.assertEqual(ContextField().as_getter("a", None)(serializer), 1)
+        self.assertEqual(ContextField("b").as_getter("a", None)(serializer), 2)
+        fn = ContextField(lambda context: context["a"] + context["b"]).as_getter("a", None)
+        self.assertEqual(fn(serializer), 3)
+
     def test_field_label(self):
         field1 = StrField(label="@id")
         self.assertEqual(field1.label, "@id")
@@ -0,0 +1,78 @@
+import unittest
+from unittest import mock
+
+from django.conf import settings
+
+settings.configure()
+
+from drf_serpy import metrics
+from drf_serpy.fields import Field
+from drf_serpy.metrics import InMemoryMetrics, MetricsSink
+from drf_serpy.renderers import SerpyJSONRenderer, SerpyResponse
+from drf_serpy.serializer import Serializer
+
+from .obj import Obj
+
+
+class ASerializer(Serializer):
+    a = Field()
+
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        self.metrics = InMemoryMetrics()
+        metrics.configure(self.metrics)
+
+    def tearDown(self):
+        metrics.configure(None)
+
+    def test_record(self):
+        ASerializer([Obj(a=i) for i in range(10)], many=True).data
+        serializer = ASerializer(Obj(a=1))
+        serializer.data
+        serializer.data
+
+        stats = self.metrics.snapshot()["tests.test_metrics.ASerializer"]
+        self.assertEqual(stats["calls"], 2)
+        self.assertEqual(stats["objects"], 11)
+        self.assertGreater(stats["seconds"], 0)
+        self.assertGreater(stats["objects_per_second"], 0)
+        self.assertEqual(stats["sized_calls"], 0)
+
+        self.metrics.reset()
+        self.assertEqual(self.metrics.snapshot(), {})
+
+    def test_lazy(self):
+        data = ASerializer([Obj(a=1), Obj(a=2)], many=True, lazy=True).data
+        self.assertEqual(repr(data), "<LazyList (not loaded)>")
+        self.assertEqual(self.metrics.snapshot(), {})
+
+    def test_record_size(self):
+        renderer = SerpyJSONRenderer()
+        renderer.render(ASerializer(Obj(a=1)))
+        response = SerpyResponse(ASerializer([Obj(a=1), Obj(a=2)], many=True))
+        renderer.render(response.data, renderer_context={"response": response})
+        renderer.render({"a": 1})
+
+        stats = self.metrics.snapshot()["tests.test_metrics.ASerializer"]
+        self.assertEqual(stats["sized_calls"], 2)
+        self.assertEqual(stats["bytes"], len(b'{"a":1}') + len(b'[{"a":1},{"a":2}]'))
+
+    def test_sample_rate(self):
+        sink = mock.Mock(spec=MetricsSink)
+        metrics.configure(sink, sample_rate=0.5)
+        with mock.patch("random.random", side_effect=[0.7, 0.2]):
+            ASerializer(Obj(a=1)).data
+            ASerializer(Obj(a=1)).data
+        self.assertEqual(sink.record.call_count, 1)
+
+        metrics.configure(sink, sample_rate=0)
+        ASerializer(Obj(a=1)).data
+        self.assertEqual(sink.record.call_count, 1)
+
+        with self.assertRaises(ValueError):
+            metrics.configure(sink, sample_rate=2)
+
+
+if __name__ == "__main__":
+    unittest.main()
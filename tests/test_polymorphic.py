@@ -0,0 +1,106 @@
+import unittest
+from typing import Dict
+
+from django.conf import settings
+
+settings.configure()
+
+from drf_serpy.fields import BatchMethodField, ContextField, Field
+from drf_serpy.polymorphic import PolymorphicSerializer
+from drf_serpy.serializer import DictSerializer, Serializer
+
+from .obj import Obj
+
+
+class Post(Obj):
+    pass
+
+
+class Announcement(Post):
+    pass
+
+
+class Comment(Obj):
+    pass
+
+
+class PostSerializer(Serializer):
+    title = Field()
+    currency = ContextField(required=False)
+
+
+class CommentSerializer(Serializer):
+    text = Field()
+    batch = BatchMethodField()
+
+    def get_batch(self, comments) -> Dict[Comment, int]:
+        self.context["calls"].append(len(comments))
+        return {comment: len(comments) for comment in comments}
+
+
+class FeedSerializer(PolymorphicSerializer):
+    serializers = {Post: PostSerializer, Comment: CommentSerializer()}
+
+
+class TestPolymorphicSerializer(unittest.TestCase):
+    def test_many(self):
+        objs = [
+            Post(title="a"),
+            Comment(text="b"),
+            Announcement(title="c"),
+            Comment(text="d"),
+        ]
+        context = {"calls": [], "currency": "EUR"}
+        data = FeedSerializer(objs, many=True, context=context).data
+        self.assertEqual(
+            data,
+            [
+                {"title": "a", "currency": "EUR"},
+                {"text": "b", "batch": 2},
+                {"title": "c", "currency": "EUR"},
+                {"text": "d", "batch": 2},
+            ],
+        )
+        # the comments are serialized together
+        self.assertEqual(context["calls"], [2])
+        self.assertEqual(FeedSerializer.serialize_many(objs, context), data)
+        # the serializer of the subclass is resolved through its MRO once
+        self.assertIs(
+            FeedSerializer._dispatch_cache[Announcement], FeedSerializer._prototypes[Post]
+        )
+
+    def test_single(self):
+        self.assertEqual(FeedSerializer(Announcement(title="a")).data, {"title": "a"})
+        with self.assertRaises(TypeError):
+            FeedSerializer(Obj(title="a")).data
+
+    def test_discriminator(self):
+        class TextSerializer(DictSerializer):
+            text = Field()
+
+        class ImageSerializer(DictSerializer):
+            url = Field()
+
+        class EventSerializer(PolymorphicSerializer):
+            default_getter = DictSerializer.default_getter
+            discriminator = "kind"
+            serializers = {"text": TextSerializer, "image": ImageSerializer}
+
+        events = [{"kind": "image", "url": "a"}, {"kind": "text", "text": "b"}]
+        self.assertEqual(EventSerializer(events, many=True).data, [{"url": "a"}, {"text": "b"}])
+        with self.assertRaises(TypeError):
+            EventSerializer({"kind": "unknown"}).data
+
+    def test_nested(self):
+        class PageSerializer(Serializer):
+            items = FeedSerializer(many=True)
+
+        page = Obj(items=[Comment(text="a"), Post(title="b")])
+        data = PageSerializer(page, context={"calls": [], "currency": "USD"}).data
+        self.assertEqual(
+            data["items"], [{"text": "a", "batch": 1}, {"title": "b", "currency": "USD"}]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
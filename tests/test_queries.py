@@ -0,0 +1,133 @@
+import unittest
+import warnings
+from unittest import mock
+
+import django
+from django.conf import settings
+
+settings.configure(
+    DATABASES={"default": {"ENGINE": "django.db.backends.sqlite3", "NAME": ":memory:"}}
+)
+django.setup()
+
+from django.db import connection
+
+from drf_serpy import queries
+from drf_serpy.fields import Field, MethodField
+from drf_serpy.queries import QueryBudgetExceeded, QueryBudgetWarning
+from drf_serpy.serializer import Serializer
+
+from .obj import Obj
+
+
+def query(sql):
+    with connection.cursor() as cursor:
+        cursor.execute(sql)
+        return cursor.fetchone()[0]
+
+
+class Related(Obj):
+    @property
+    def name(self):
+        return query("SELECT 'name'")
+
+
+class RelatedSerializer(Serializer):
+    name = Field()
+
+
+class ItemSerializer(Serializer):
+    id = Field()
+    related = RelatedSerializer()
+    total = MethodField()
+    query_budget = 2
+
+    def get_total(self, obj):
+        return query("SELECT 1 + 1")
+
+
+class TestQueries(unittest.TestCase):
+    def setUp(self):
+        self.items = [Obj(id=i, related=Related()) for i in range(3)]
+
+    def tearDown(self):
+        queries.configure(None)
+
+    def test_track(self):
+        with queries.track(budget=10, n_plus_one=False) as reports:
+            data = ItemSerializer(self.items, many=True).data
+        self.assertEqual(data[0], {"id": 0, "related": {"name": "name"}, "total": 2})
+        (report,) = reports
+        self.assertEqual(report.count, 6)
+        self.assertFalse(report.exceeded)
+        self.assertEqual(
+            report.by_field(), {(RelatedSerializer, "name"): 3, (ItemSerializer, "total"): 3}
+        )
+        self.assertEqual(
+            report.n_plus_one, [(RelatedSerializer, "name", 3), (ItemSerializer, "total", 3)]
+        )
+        self.assertIn("RelatedSerializer.name: 3  N+1", str(report))
+
+    def test_budget(self):
+        with queries.track():
+            ItemSerializer(self.items[0]).data
+            with self.assertRaises(QueryBudgetExceeded) as raised:
+                ItemSerializer(self.items, many=True).data
+        self.assertEqual(raised.exception.report.budget, 2)
+        self.assertTrue(raised.exception.report.exceeded)
+
+        # outside of the block, nothing is tracked
+        ItemSerializer(self.items, many=True).data
+
+    def test_call_fields(self):
+        class CallSerializer(Serializer):
+            a = Field(call=True)
+            b = Field(call=True, required=False)
+            c = Field(call=True, required=False)
+
+        def missing():
+            raise AttributeError("missing")
+
+        objs = [Obj(a=lambda: query("SELECT 1"), b=None, c=missing)]
+        with self.assertRaises(AttributeError):
+            CallSerializer(objs, many=True).data
+        with queries.track(n_plus_one=False):
+            with self.assertRaises(AttributeError):
+                CallSerializer(objs, many=True).data
+
+        del objs[0].c
+        expected = [{"a": 1, "b": None}]
+        self.assertEqual(CallSerializer(objs, many=True).data, expected)
+        with queries.track(n_plus_one=False) as reports:
+            self.assertEqual(CallSerializer(objs, many=True).data, expected)
+        self.assertEqual(reports[0].by_field(), {(CallSerializer, "a"): 1})
+
+    def test_configure(self):
+        queries.configure("warn", budget=1)
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            RelatedSerializer(Related()).data
+            RelatedSerializer([Related(), Related()], many=True).data
+        self.assertEqual(len(caught), 1)
+        self.assertIs(caught[0].category, QueryBudgetWarning)
+
+        queries.configure("log", budget=1, sample_rate=0)
+        RelatedSerializer([Related(), Related()], many=True).data
+        with self.assertRaises(ValueError):
+            queries.configure("ignore")
+
+    def test_sample(self):
+        class Local(object):
+            def __getattribute__(self, name):
+                raise AssertionError(name)
+
+        # nothing is tracked, the thread locals aren't looked up
+        with mock.patch.object(queries, "_local", Local()):
+            self.assertIsNone(queries.sample())
+        with queries.track():
+            self.assertIsNotNone(queries.sample())
+        self.assertIsNone(queries.sample())
+
+
+if __name__ == "__main__":
+    unittest.main()
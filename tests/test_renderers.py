@@ -0,0 +1,87 @@
+import json
+import unittest
+from datetime import datetime
+from decimal import Decimal
+from unittest import mock
+
+from django.conf import settings
+
+settings.configure()
+
+from rest_framework.renderers import JSONRenderer
+
+from drf_serpy import encoders
+from drf_serpy.encoders import JSONFragment, dumps
+from drf_serpy.fields import Field, MethodField
+from drf_serpy.renderers import SerpyJSONRenderer, SerpyResponse
+from drf_serpy.serializer import Serializer
+
+from .obj import Obj
+
+
+class ASerializer(Serializer):
+    a = Field()
+    cached = MethodField()
+
+    def get_cached(self, obj):
+        return JSONFragment(obj.cached)
+
+
+class TestEncoders(unittest.TestCase):
+    def test_dumps(self):
+        data = {"a": 1, "b": ["ü", None, True, 2.5]}
+        self.assertEqual(json.loads(dumps(data)), data)
+
+    def test_fragment(self):
+        data = {"a": JSONFragment('{"b":[1,2]}'), "c": [JSONFragment(b'"d"'), 3]}
+        self.assertEqual(dumps(data), b'{"a":{"b":[1,2]},"c":["d",3]}')
+
+    def test_default(self):
+        self.assertEqual(json.loads(dumps({"a": Decimal("1.5")}, default=str)), {"a": "1.5"})
+        with self.assertRaises(TypeError):
+            dumps({"a": Decimal("1.5")})
+
+    def test_lazy_list(self):
+        data = ASerializer([Obj(a=1, cached="2")], many=True, lazy=True).data
+        self.assertEqual(dumps({"r": data}), b'{"r":[{"a":1,"cached":2}]}')
+        with mock.patch.object(encoders, "orjson", None):
+            self.assertEqual(dumps(data), b'[{"a":1,"cached":2}]')
+
+    def test_without_orjson(self):
+        with mock.patch.object(encoders, "orjson", None):
+            data = {"a": JSONFragment('{"b":[1,2]}'), "c": "ü"}
+            self.assertEqual(dumps(data), '{"a":{"b":[1,2]},"c":"ü"}'.encode("utf-8"))
+            self.assertEqual(dumps({"a": 1}, indent=2), b'{\n  "a": 1\n}')
+            with self.assertRaises(ValueError):
+                dumps({"a": float("nan")})
+
+
+class TestSerpyJSONRenderer(unittest.TestCase):
+    def test_render(self):
+        renderer = SerpyJSONRenderer()
+        obj = Obj(a=datetime(2022, 1, 1), cached='{"x":1}')
+        self.assertEqual(
+            renderer.render(ASerializer(obj)), b'{"a":"2022-01-01T00:00:00","cached":{"x":1}}'
+        )
+        self.assertEqual(renderer.render({"a": "\u2028"}), b'{"a":"\\u2028"}')
+        self.assertEqual(renderer.render(None), b"")
+
+    def test_drf_renderer(self):
+        serializer = ASerializer([Obj(a=1, cached="2"), Obj(a=3, cached="4")], many=True)
+        data = serializer.to_value(serializer.instance)
+        serializer.lazy = True
+        lazy_data = serializer.to_value(serializer.instance)
+        rendered = JSONRenderer().render({"results": lazy_data})
+        self.assertEqual(rendered, JSONRenderer().render({"results": data}))
+        self.assertEqual(json.loads(rendered)["results"][1]["a"], 3)
+
+    def test_response(self):
+        serializer = ASerializer([Obj(a=1, cached="2")], many=True)
+        response = SerpyResponse(serializer)
+        self.assertIs(response.serializer, serializer)
+        self.assertEqual(response.data, [{"a": 1, "cached": b"2"}])
+        self.assertIsNone(SerpyResponse({"a": 1}).serializer)
+
+
+if __name__ == "__main__":
+    unittest.main()
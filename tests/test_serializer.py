@@ -1,10 +1,23 @@
 from django.conf import settings
 
 settings.configure()
+import threading
 import unittest
-
-from drf_serpy.fields import Field, FloatField, IntField, MethodField, StrField
-from drf_serpy.serializer import DictSerializer, Serializer
+from typing import Dict
+
+from drf_serpy.fields import (
+    BatchMethodField,
+    ConstField,
+    ContextField,
+    Field,
+    FloatField,
+    IntField,
+    Loader,
+    MethodField,
+    RecursiveField,
+    StrField,
+)
+from drf_serpy.serializer import DictSerializer, Serializer, compile_stats, warmup
 
 from .obj import Obj
 
@@ -262,6 +275,564 @@ class TestSerializer(unittest.TestCase):
         self.assertIn("@content", data)
         self.assertEqual(data["@content"], "http://baz/bar/foo/")
 
+    def test_per_call_fields(self):
+        calls = []
+
+        class ASerializer(Serializer):
+            a = Field()
+            version = ConstField(2)
+            currency = ContextField()
+            rate = ContextField(lambda context: context["rates"][context["currency"]])
+            dummy = MethodField(per_call=True)
+
+            def get_dummy(self):
+                calls.append(self)
+                return list(range(3))
+
+        context = {"currency": "EUR", "rates": {"EUR": 1.5}}
+        data = ASerializer([Obj(a=i) for i in range(3)], many=True, context=context).data
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(
+            data[2], {"a": 2, "version": 2, "currency": "EUR", "rate": 1.5, "dummy": [0, 1, 2]}
+        )
+        self.assertEqual(list(data[0]), ["a", "version", "currency", "rate", "dummy"])
+
+    def test_optional_context_field(self):
+        class ASerializer(Serializer):
+            a = Field()
+            b = ContextField(required=False)
+            c = IntField(required=False, attr="missing")
+
+        self.assertEqual(ASerializer(Obj(a=1)).data, {"a": 1})
+        self.assertEqual(ASerializer(Obj(a=1), context={"b": 2}).data, {"a": 1, "b": 2})
+
+        class BSerializer(Serializer):
+            b = ContextField()
+
+        with self.assertRaises(KeyError):
+            BSerializer(Obj()).data
+
+    def test_nested_per_call_fields(self):
+        calls = []
+
+        class ASerializer(Serializer):
+            a = Field()
+            currency = ContextField()
+            dummy = MethodField(per_call=True)
+
+            def get_dummy(self) -> int:
+                calls.append(self)
+                return 5
+
+        class BSerializer(Serializer):
+            b = ASerializer(many=True)
+            c = ASerializer()
+
+        objs = [Obj(b=[Obj(a=1), Obj(a=2)], c=Obj(a=3)) for _ in range(3)]
+        data = BSerializer(objs, many=True, context={"currency": "EUR"}).data
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(data[2]["c"], {"a": 3, "currency": "EUR", "dummy": 5})
+        self.assertEqual(data[1]["b"][1], {"a": 2, "currency": "EUR", "dummy": 5})
+
+    def test_nested_method_field(self):
+        class ASerializer(Serializer):
+            a = MethodField()
+
+            def get_a(self, obj):
+                return (self.context or {}).get("currency")
+
+        class BSerializer(Serializer):
+            b = ASerializer()
+
+        obj = Obj(b=Obj())
+        self.assertEqual(BSerializer(obj, context={"currency": "EUR"}).data, {"b": {"a": "EUR"}})
+        self.assertEqual(BSerializer(obj).data, {"b": {"a": None}})
+        # without a context the nested serializer is neither copied nor prepared
+        serializer = BSerializer(obj)
+        fields = BSerializer._compiled_fields
+        self.assertIs(serializer._prepare_fields(fields), fields)
+
+    def test_batch_method_field(self):
+        calls = []
+
+        class ASerializer(Serializer):
+            a = Field()
+            double = BatchMethodField()
+            plus = BatchMethodField("add", key="a", required=False)
+
+            def get_double(self, objs) -> Dict[Obj, int]:
+                calls.append(objs)
+                return {o: o.a * 2 for o in objs}
+
+            def add(self, objs) -> Dict[int, int]:
+                return {o.a: o.a + 1 for o in objs if o.a != 2}
+
+        objs = [Obj(a=i) for i in range(3)]
+        data = ASerializer(iter(objs), many=True).data
+        self.assertEqual(calls, [objs])
+        self.assertEqual(data[1], {"a": 1, "double": 2, "plus": 2})
+        self.assertEqual(data[2], {"a": 2, "double": 4})
+        self.assertEqual(ASerializer(objs[1]).data, {"a": 1, "double": 2, "plus": 2})
+        self.assertEqual(ASerializer.to_schema().schema.properties["plus"].type, "integer")
+
+        class BSerializer(Serializer):
+            b = BatchMethodField(key="a")
+
+            def get_b(self, objs):
+                return {}
+
+        with self.assertRaises(KeyError):
+            BSerializer(objs, many=True).data
+
+    def test_nested_batch_method_field(self):
+        calls = []
+
+        class PSerializer(Serializer):
+            n = BatchMethodField()
+
+            def get_n(self, objs) -> Dict[Obj, int]:
+                calls.append(len(objs))
+                return {o: o.n * self.context["factor"] for o in objs}
+
+        class CSerializer(Serializer):
+            post = PSerializer(required=False)
+            posts = PSerializer(many=True)
+
+        class RootSerializer(Serializer):
+            comments = CSerializer(many=True)
+
+        rows = [Obj(post=Obj(n=i), posts=[Obj(n=i), Obj(n=-i)]) for i in range(5)]
+        del rows[1].post
+        rows[2].post = None
+        context = {"factor": 10}
+        data = CSerializer(rows, many=True, context=context).data
+        # once for each nested field, with the objects of all the rows
+        self.assertEqual(calls, [3, 10])
+        self.assertEqual(data[0], {"post": {"n": 0}, "posts": [{"n": 0}, {"n": 0}]})
+        self.assertEqual(data[1], {"posts": [{"n": 10}, {"n": -10}]})
+        self.assertEqual(data[2]["post"], None)
+        self.assertEqual(data[4]["post"], {"n": 40})
+
+        calls.clear()
+        roots = [Obj(comments=rows[:2]), Obj(comments=rows[3:])]
+        data = RootSerializer(roots, many=True, context=context).data
+        self.assertEqual(calls, [3, 8])
+        self.assertEqual(data[1]["comments"][1]["posts"][1], {"n": -40})
+        self.assertEqual(CSerializer(rows[3], context=context).data["post"], {"n": 30})
+
+    def test_loader(self):
+        teams = {1: Obj(name="red"), 2: Obj(name="blue")}
+        users = {10: Obj(name="a", team_id=1), 11: Obj(name="b", team_id=2)}
+        calls = []
+
+        class DictLoader(Loader):
+            def __init__(self, objects):
+                self.objects = objects
+
+            def load_many(self, keys):
+                calls.append(sorted(keys))
+                return {k: self.objects[k] for k in keys if k in self.objects}
+
+        class TeamSerializer(Serializer):
+            name = Field()
+
+        class UserSerializer(Serializer):
+            name = Field()
+            team = TeamSerializer(loader=DictLoader(teams))
+
+        class PostSerializer(Serializer):
+            author = UserSerializer(loader=DictLoader(users))
+            editors = UserSerializer(many=True, loader=DictLoader(users), key="editor_ids")
+            team_name = StrField(loader=DictLoader(teams), key=lambda post: post.team_id)
+
+        posts = [
+            Obj(author_id=10, editor_ids=[10, 11], team_id=2),
+            Obj(author_id=11, editor_ids=[], team_id=1),
+            Obj(author_id=None, editor_ids=[11], team_id=2),
+        ]
+        data = PostSerializer(posts, many=True).data
+        # one call per relation per level
+        self.assertEqual(calls, [[10, 11], [1, 2], [10, 11], [1, 2], [1, 2]])
+        self.assertEqual(data[0]["author"], {"name": "a", "team": {"name": "red"}})
+        self.assertEqual(data[0]["editors"][1], {"name": "b", "team": {"name": "blue"}})
+        self.assertEqual(data[1]["editors"], [])
+        self.assertIsNone(data[2]["author"])
+        self.assertEqual(data[2]["team_name"], str(teams[2]))
+
+    def test_loader_missing_key(self):
+        class ASerializer(Serializer):
+            a = Field()
+
+        class BSerializer(Serializer):
+            b = ASerializer(loader=lambda keys: {1: Obj(a=1)}, required=False)
+
+        data = BSerializer([Obj(b_id=1), Obj(), Obj(b_id=2)], many=True).data
+        self.assertEqual(data, [{"b": {"a": 1}}, {}, {}])
+
+        class CSerializer(Serializer):
+            c = ASerializer(loader=lambda keys: {})
+
+        with self.assertRaises(KeyError):
+            CSerializer(Obj(c_id=2)).data
+
+    def test_omit_none(self):
+        class ASerializer(Serializer):
+            a = Field()
+            b = IntField(attr="c.b")
+
+        class BSerializer(Serializer):
+            a = IntField()
+            b = StrField(required=False)
+            c = ASerializer()
+            d = MethodField()
+
+            def get_d(self, obj):
+                return obj.d
+
+        objs = [Obj(a="1", b=None, c=None, d=None), Obj(a=None, c=Obj(a=None, c=Obj(b="2")), d=4)]
+        data = BSerializer(objs, many=True, omit_none=True).data
+        # nested serializers omit None values as well
+        self.assertEqual(data, [{"a": 1}, {"c": {"b": 2}, "d": 4}])
+        self.assertEqual(BSerializer(objs[0], omit_none=True).data, {"a": 1})
+
+        class SparseSerializer(BSerializer):
+            omit_none = True
+            c = ASerializer(omit_none=True)
+
+        self.assertEqual(SparseSerializer(objs[1]).data, {"c": {"b": 2}, "d": 4})
+        obj = Obj(a=1, b=None, c=Obj(a=1, c=Obj(b=1)), d=None)
+        self.assertEqual(SparseSerializer(obj, omit_none=False).data["d"], None)
+
+    def test_lazy_compile(self):
+        class ASerializer(Serializer):
+            lazy_compile = True
+            a = Field()
+
+        class BSerializer(ASerializer):
+            b = ASerializer()
+
+        class CSerializer(Serializer):
+            lazy_compile = True
+            c = Field()
+
+        self.assertIn("_compiled_fields", ASerializer.__dict__)
+        self.assertNotIsInstance(ASerializer.__dict__["_compiled_fields"], tuple)
+        self.assertEqual(compile_stats()["pending"], 3)
+
+        compiled = compile_stats()["compiled"]
+        self.assertEqual(BSerializer(Obj(a=1, b=Obj(a=2))).data, {"a": 1, "b": {"a": 2}})
+        self.assertIsInstance(BSerializer.__dict__["_compiled_fields"], tuple)
+        self.assertIsInstance(ASerializer.__dict__["_compiled_fields"], tuple)
+        self.assertEqual(compile_stats()["compiled"], compiled + 2)
+
+        stats = warmup()
+        self.assertEqual(stats["pending"], 0)
+        self.assertEqual(stats["compiled"], compiled + 3)
+        self.assertGreater(stats["seconds"], 0)
+        self.assertEqual(CSerializer(Obj(c=1)).data, {"c": 1})
+
+    def test_lazy_compile_once(self):
+        class ASerializer(Serializer):
+            lazy_compile = True
+            a = Field()
+
+        compiled = compile_stats()["compiled"]
+        barrier = threading.Barrier(8)
+        results = []
+
+        def serialize():
+            barrier.wait()
+            results.append(ASerializer(Obj(a=1)).data)
+
+        threads = [threading.Thread(target=serialize) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, [{"a": 1}] * 8)
+        self.assertEqual(compile_stats()["compiled"], compiled + 1)
+
+    def test_expand(self):
+        class CSerializer(Serializer):
+            pk_attr = "c"
+            c = Field()
+
+        class BSerializer(Serializer):
+            pk_attr = "id"
+            b = Field()
+            cs = CSerializer(many=True, expandable=True)
+            dummy = MethodField(per_call=True)
+
+            def get_dummy(self):
+                return self.context["dummy"]
+
+        class ASerializer(Serializer):
+            a = Field()
+            b = BSerializer(expandable=True)
+            bs = BSerializer(many=True, expandable=True, attr="b_list")
+
+        b = Obj(id=5, b=1, cs=[Obj(c=2)])
+        obj = Obj(a=1, b_id=5, b=b, b_list=[b, Obj(id=6, b=3, cs=[])])
+        context = {"dummy": "d"}
+        self.assertEqual(ASerializer(obj).data, {"a": 1, "b": 5, "bs": [5, 6]})
+        self.assertEqual(
+            ASerializer(obj, expand="b", context=context).data,
+            {"a": 1, "b": {"b": 1, "cs": [2], "dummy": "d"}, "bs": [5, 6]},
+        )
+        data = ASerializer(obj, expand=["bs.cs", "unknown", "a.x"], context=context).data
+        self.assertEqual(data["b"], 5)
+        self.assertEqual(data["bs"][0], {"b": 1, "cs": [{"c": 2}], "dummy": "d"})
+        self.assertEqual(data["bs"][1], {"b": 3, "cs": [], "dummy": "d"})
+
+        # plans are cached for each set of expanded fields
+        ASerializer(obj, expand="bs.cs,unknown")
+        self.assertEqual(len(ASerializer._expand_plans), 2)
+        # unknown nested names don't add plans either
+        for i in range(50):
+            ASerializer(obj, expand="b.junk{0},bs.cs.x{0}.y".format(i))
+        self.assertEqual(len(ASerializer._expand_plans), 3)
+        self.assertEqual(len(BSerializer._expand_plans), 1)
+        self.assertEqual(ASerializer(obj).data, {"a": 1, "b": 5, "bs": [5, 6]})
+
+        # collapsed fields are documented as primary keys
+        properties = ASerializer.to_schema().schema.properties
+        self.assertEqual(properties["b"]["type"], "integer")
+        self.assertEqual(properties["bs"]["type"], "array")
+        self.assertEqual(properties["bs"]["items"]["type"], "integer")
+
+    def test_lazy(self):
+        calls = []
+
+        class ASerializer(Serializer):
+            a = Field()
+            total = BatchMethodField()
+
+            def get_total(self, objs) -> Dict[int, int]:
+                calls.append(len(objs))
+                return {obj: sum(o.a for o in objs) for obj in objs}
+
+        objs = [Obj(a=i) for i in range(10)]
+        data = ASerializer(iter(objs), many=True, lazy=True).data
+        self.assertEqual(repr(data), "<LazyList (not loaded)>")
+        self.assertEqual(len(data), 10)
+        self.assertEqual(data[3], {"a": 3, "total": 45})
+        self.assertEqual(data[-2:], [{"a": 8, "total": 45}, {"a": 9, "total": 45}])
+        self.assertEqual(repr(data), "<LazyList 3/10 serialized>")
+        self.assertIs(data[3], data[3])
+        self.assertEqual(data, ASerializer(objs, many=True).data)
+        self.assertEqual(calls, [10, 10])
+        with self.assertRaises(IndexError):
+            data[10]
+
+    def test_lazy_incremental(self):
+        class ASerializer(Serializer):
+            a = Field()
+
+        pulled = []
+
+        def generate():
+            for i in range(100000):
+                pulled.append(i)
+                yield Obj(a=i)
+
+        data = ASerializer(generate(), many=True, lazy=True).data
+        self.assertEqual(data[0], {"a": 0})
+        self.assertEqual(data[2:5], [{"a": 2}, {"a": 3}, {"a": 4}])
+        self.assertEqual(data[6:3:-2], [{"a": 6}, {"a": 4}])
+        self.assertEqual(len(pulled), 7)
+        self.assertEqual(repr(data), "<LazyList 5/7+ serialized>")
+        for row in data:
+            if row["a"] == 9:
+                break
+        self.assertEqual(len(pulled), 10)
+        # serialized rows don't keep their object
+        self.assertEqual(data._instances[:3], [None, None, None])
+
+        self.assertEqual(data[-1], {"a": 99999})
+        self.assertEqual(len(data), 100000)
+        self.assertEqual(repr(data), "<LazyList 11/100000 serialized>")
+        self.assertEqual(list(data)[-2:], [{"a": 99998}, {"a": 99999}])
+
+    def test_sideload(self):
+        class UserSerializer(Serializer):
+            pk_attr = "id"
+            resource_type = "users"
+            id = Field()
+            name = Field()
+            rank = BatchMethodField()
+
+            def get_rank(self, users) -> Dict[Obj, int]:
+                # called once for the users of every field
+                batches.append(len(users))
+                return {user: user.id for user in users}
+
+        class PostSerializer(Serializer):
+            pk_attr = "id"
+            title = Field()
+            author = UserSerializer()
+            currency = ContextField()
+
+        class CommentSerializer(Serializer):
+            text = Field()
+            user = UserSerializer()
+            post = PostSerializer()
+            likes = UserSerializer(many=True)
+
+        batches = []
+        alice, bob = Obj(id=1, name="alice"), Obj(id=2, name="bob")
+        post = Obj(id=7, title="t", author=alice)
+        comments = [
+            Obj(text="a", user=alice, post=post, likes=[bob]),
+            Obj(text="b", user=bob, post=post, likes=[alice, bob]),
+        ]
+        data = CommentSerializer(
+            comments, many=True, sideload=True, context={"currency": "EUR"}
+        ).data
+        self.assertEqual(
+            data["data"],
+            [
+                {"text": "a", "user": 1, "post": 7, "likes": [2]},
+                {"text": "b", "user": 2, "post": 7, "likes": [1, 2]},
+            ],
+        )
+        self.assertEqual(
+            data["included"],
+            {
+                "users": {
+                    1: {"id": 1, "name": "alice", "rank": 1},
+                    2: {"id": 2, "name": "bob", "rank": 2},
+                },
+                "PostSerializer": {7: {"title": "t", "author": 1, "currency": "EUR"}},
+            },
+        )
+        self.assertEqual(batches, [2])
+        data = CommentSerializer(
+            comments[0], sideload=True, lazy=True, context={"currency": "EUR"}
+        ).data
+        self.assertEqual(data["data"]["post"], 7)
+        self.assertEqual(len(data["included"]["users"]), 2)
+
+    def test_recursive_field(self):
+        class NodeSerializer(Serializer):
+            name = Field()
+            children = RecursiveField(many=True)
+            parent = RecursiveField(required=False, max_depth=0)
+            size = BatchMethodField()
+
+            def get_size(self, nodes) -> Dict[Obj, int]:
+                # called once for each level
+                self.context["levels"].append(len(nodes))
+                return {node: len(nodes) for node in nodes}
+
+        tree = Obj(name="root", children=[Obj(name="a", children=[]), Obj(name="b", children=[])])
+        tree.children[1].children.append(Obj(name="c", children=[], parent=tree.children[1]))
+        context = {"levels": []}
+        data = NodeSerializer(tree, context=context).data
+        self.assertEqual(context["levels"], [1, 2, 1])
+        self.assertEqual(list(data), ["name", "children", "size"])
+        self.assertEqual(data["children"][0], {"name": "a", "children": [], "size": 2})
+        self.assertEqual(
+            data["children"][1]["children"], [{"name": "c", "children": [], "size": 1}]
+        )
+
+        class ChainSerializer(Serializer):
+            n = Field()
+            next = RecursiveField()
+
+        class ShortChainSerializer(ChainSerializer):
+            next = RecursiveField(max_depth=2)
+
+        chain = Obj(n=0, next=None)
+        for n in range(1, 50000):
+            chain = Obj(n=n, next=chain)
+        data = ChainSerializer([chain], many=True).data[0]
+        depth = 0
+        while data["next"] is not None:
+            data = data["next"]
+            depth += 1
+        self.assertEqual((depth, data["n"]), (49999, 0))
+        self.assertEqual(
+            ShortChainSerializer(chain).data,
+            {"n": 49999, "next": {"n": 49998, "next": {"n": 49997}}},
+        )
+
+    def test_serialize_classmethods(self):
+        class ChildSerializer(Serializer):
+            b = Field()
+            currency = ContextField(required=False)
+
+        class ASerializer(Serializer):
+            a = Field()
+            child = ChildSerializer()
+            total = MethodField()
+
+            def get_total(self, obj):
+                return obj.a * self.context["rate"] if self.context else obj.a
+
+        objs = [Obj(a=i, child=Obj(b=i)) for i in range(3)]
+        self.assertEqual(
+            ASerializer.serialize_one(objs[1]), {"a": 1, "child": {"b": 1}, "total": 1}
+        )
+        context = {"rate": 10, "currency": "EUR"}
+        self.assertEqual(
+            ASerializer.serialize_many(objs, context),
+            ASerializer(objs, many=True, context=context).data,
+        )
+        self.assertEqual(ASerializer.serialize_many(iter(objs))[2]["total"], 2)
+        # the shared instances aren't changed by the calls
+        self.assertIsNone(ASerializer._get_prototype(True).context)
+        self.assertIsNot(ASerializer._get_prototype(False), ChildSerializer._get_prototype(False))
+
+        class CountSerializer(Serializer):
+            n = MethodField()
+
+            def get_n(self, obj):
+                # state kept on the serializer must not leak between calls
+                self.seen = getattr(self, "seen", 0) + 1
+                return self.seen
+
+        self.assertEqual(CountSerializer.serialize_many(objs), [{"n": 1}, {"n": 2}, {"n": 3}])
+        self.assertEqual(CountSerializer.serialize_many(objs), [{"n": 1}, {"n": 2}, {"n": 3}])
+        self.assertEqual(CountSerializer.serialize_one(objs[0]), {"n": 1})
+        self.assertFalse(hasattr(CountSerializer._get_prototype(True), "seen"))
+
+    def test_threads(self):
+        class ASerializer(Serializer):
+            a = Field()
+            b = MethodField()
+
+            def get_b(self, obj):
+                # state kept on the serializer must not leak between calls
+                self.seen = getattr(self, "seen", 0) + 1
+                return "{0}-{1}-{2}".format(self.context["thread"], obj.a, self.seen)
+
+        class BSerializer(Serializer):
+            items = ASerializer(many=True)
+            currency = ContextField(key="thread")
+
+        self.assertIsNot(BSerializer._field_map, ASerializer._field_map)
+        with self.assertRaises(TypeError):
+            BSerializer._field_map["c"] = Field()
+
+        barrier = threading.Barrier(8)
+        results = {}
+
+        def serialize(thread):
+            barrier.wait()
+            obj = Obj(items=[Obj(a=i) for i in range(100)])
+            for _ in range(20):
+                data = BSerializer(obj, context={"thread": thread}).data
+                self.assertEqual(data["currency"], thread)
+            results[thread] = data
+
+        threads = [threading.Thread(target=serialize, args=(t,)) for t in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for thread, data in results.items():
+            self.assertEqual(data["items"][-1]["b"], "{0}-99-100".format(thread))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,150 @@
+import importlib.util
+import unittest
+from typing import List
+
+from django.conf import settings
+
+settings.configure()
+
+from drf_serpy.fields import Field, IntField, MethodField, StrField
+from drf_serpy.serializer import Serializer
+
+HAS_SQLALCHEMY = importlib.util.find_spec("sqlalchemy") is not None
+
+if HAS_SQLALCHEMY:
+    from sqlalchemy import Column, ForeignKey, Integer, String, Table, create_engine, event, select
+    from sqlalchemy.orm import Session, declarative_base, relationship
+
+    from drf_serpy.sqlalchemy import load_options
+
+    Base = declarative_base()
+
+    post_tags = Table(
+        "post_tags",
+        Base.metadata,
+        Column("post_id", ForeignKey("post.id"), primary_key=True),
+        Column("tag_id", ForeignKey("tag.id"), primary_key=True),
+    )
+
+    class User(Base):
+        __tablename__ = "user"
+        id = Column(Integer, primary_key=True)
+        username = Column(String)
+        email = Column(String)
+
+    class Tag(Base):
+        __tablename__ = "tag"
+        id = Column(Integer, primary_key=True)
+        name = Column(String)
+        description = Column(String)
+
+    class Post(Base):
+        __tablename__ = "post"
+        id = Column(Integer, primary_key=True)
+        title = Column(String)
+        content = Column(String)
+        author_id = Column(ForeignKey("user.id"))
+        author = relationship(User)
+        tags = relationship(Tag, secondary=post_tags)
+        comments = relationship("Comment", back_populates="post")
+
+    class Comment(Base):
+        __tablename__ = "comment"
+        id = Column(Integer, primary_key=True)
+        text = Column(String)
+        post_id = Column(ForeignKey("post.id"))
+        post = relationship(Post, back_populates="comments")
+        user_id = Column(ForeignKey("user.id"))
+        user = relationship(User)
+
+
+class UserSerializer(Serializer):
+    id = IntField()
+    username = StrField()
+
+
+class TagSerializer(Serializer):
+    name = StrField()
+
+
+class CommentSerializer(Serializer):
+    text = StrField()
+    user = UserSerializer()
+
+
+class PostSerializer(Serializer):
+    title = StrField()
+    author = UserSerializer()
+    author_email = StrField(attr="author.email")
+    tags = TagSerializer(many=True)
+    comments = CommentSerializer(many=True)
+
+
+@unittest.skipUnless(HAS_SQLALCHEMY, "sqlalchemy is not installed")
+class TestLoadOptions(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+        Base.metadata.create_all(self.engine)
+        self.session = Session(self.engine)
+        users = [User(username=f"user-{u}", email=f"{u}@test.com") for u in range(3)]
+        tags = [Tag(name=f"tag-{t}", description="...") for t in range(4)]
+        for p in range(10):
+            post = Post(title=f"post-{p}", content="...", author=users[p % 3], tags=tags[: p % 4])
+            post.comments = [Comment(text=f"c-{c}", user=users[c % 3]) for c in range(p % 3)]
+            self.session.add(post)
+        self.session.commit()
+        self.session.expunge_all()
+
+        self.statements = []
+        event.listen(self.engine, "before_cursor_execute", self.record)
+
+    def tearDown(self):
+        self.session.close()
+        self.engine.dispose()
+
+    def record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def test_fixed_number_of_queries(self):
+        stmt = select(Post).order_by(Post.id).options(*load_options(PostSerializer, Post))
+        data = PostSerializer(self.session.scalars(stmt).unique().all(), many=True).data
+        # posts joined with their author, one query for the tags and one for the
+        # comments joined with their user
+        self.assertEqual(len(self.statements), 3)
+        self.assertEqual(len(data), 10)
+        self.assertEqual(data[4]["author"], {"id": 2, "username": "user-1"})
+        self.assertEqual(data[4]["author_email"], "1@test.com")
+        self.assertEqual(data[3]["tags"], [{"name": "tag-0"}, {"name": "tag-1"}, {"name": "tag-2"}])
+        self.assertEqual(
+            data[2]["comments"][1], {"text": "c-1", "user": {"id": 2, "username": "user-1"}}
+        )
+
+    def test_load_only(self):
+        stmt = select(Post).options(*load_options(PostSerializer, Post))
+        self.session.scalars(stmt).unique().all()
+        self.assertNotIn("post.content", self.statements[0])
+        self.assertIn("post.title", self.statements[0])
+        self.assertNotIn("description", " ".join(self.statements))
+
+        stmt = select(Post).options(*load_options(PostSerializer, Post, columns=False))
+        self.session.scalars(stmt).unique().all()
+        self.assertIn("post.content", self.statements[-3])
+
+    def test_opaque_fields(self):
+        class ASerializer(Serializer):
+            title = StrField()
+            author = Field()
+            summary = MethodField()
+
+            def get_summary(self, post) -> List[str]:
+                return [post.content]
+
+        options = load_options(ASerializer, Post)
+        self.assertEqual(len(options), 1)
+        self.session.scalars(select(Post).options(*options)).unique().all()
+        self.assertIn("post.content", self.statements[0])
+        self.assertIn("user_1.email", self.statements[0])
+
+
+if __name__ == "__main__":
+    unittest.main()